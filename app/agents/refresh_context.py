@@ -0,0 +1,115 @@
+"""
+Everything a job refresh needs to know about a user, loaded in one query.
+
+The context is a plain value object (no ORM instances) so it can be cached
+on the Celery task, passed through retries and shipped in task arguments by
+the batch scheduler.
+"""
+import logging
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from app.models.cv import CV
+from app.models.user import User
+from app.models.user_job_profile import UserJobProfile
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshContext:
+    user_id: uuid.UUID
+    email: str
+    cv_id: uuid.UUID
+    cv_version: int
+    cv_data: dict
+    target_role: str
+    location: str
+    remote_preference: str = "any"
+    contract_preference: list = field(default_factory=list)
+    min_salary: Optional[int] = None
+    skills: list = field(default_factory=list)
+    years_experience: int = 0
+
+    @property
+    def profile_dict(self) -> dict:
+        """Profile fields sent to the keyword generator and the pre-filter."""
+        return {
+            "target_role": self.target_role,
+            "location": self.location,
+            "skills": self.skills,
+            "years_experience": self.years_experience,
+        }
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["user_id"] = str(self.user_id)
+        data["cv_id"] = str(self.cv_id)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RefreshContext":
+        data = dict(data)
+        data["user_id"] = uuid.UUID(str(data["user_id"]))
+        data["cv_id"] = uuid.UUID(str(data["cv_id"]))
+        return cls(**data)
+
+    @classmethod
+    def from_rows(cls, user: User, cv: CV, profile: UserJobProfile) -> "RefreshContext":
+        return cls(
+            user_id=user.id,
+            email=user.email,
+            cv_id=cv.id,
+            cv_version=cv.version or 1,
+            cv_data=cv.data or {},
+            target_role=profile.target_role,
+            location=profile.location,
+            remote_preference=profile.remote_preference or "any",
+            contract_preference=profile.contract_preference or [],
+            min_salary=profile.min_salary,
+            skills=profile.skills or [],
+            years_experience=profile.years_experience or 0,
+        )
+
+
+def _refresh_context_query(db: Session):
+    """
+    Active users joined with their job profile and their latest CV version.
+    Users missing either are excluded by the inner joins.
+    """
+    latest_cv = (
+        db.query(CV.user_id.label("user_id"), func.max(CV.version).label("version"))
+        .group_by(CV.user_id)
+        .subquery()
+    )
+    return (
+        db.query(User, CV, UserJobProfile)
+        .join(UserJobProfile, UserJobProfile.user_id == User.id)
+        .join(latest_cv, latest_cv.c.user_id == User.id)
+        .join(CV, and_(CV.user_id == User.id, CV.version == latest_cv.c.version))
+        .filter(User.is_active == True)
+    )
+
+
+def load_refresh_context(db: Session, user_id: uuid.UUID) -> Optional[RefreshContext]:
+    row = _refresh_context_query(db).filter(User.id == user_id).first()
+    if not row:
+        logger.warning(f"User {user_id} is inactive or has no CV / job profile")
+        return None
+    return RefreshContext.from_rows(*row)
+
+
+def load_refresh_contexts(db: Session, user_ids: Iterable[uuid.UUID]) -> list[RefreshContext]:
+    """Bulk variant for the batch scheduler: one query for a whole chunk of users."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    contexts: dict[uuid.UUID, RefreshContext] = {}
+    for user, cv, profile in _refresh_context_query(db).filter(User.id.in_(user_ids)).all():
+        # Two CV rows can share a version number; keep one per user.
+        contexts.setdefault(user.id, RefreshContext.from_rows(user, cv, profile))
+    return list(contexts.values())
@@ -1,41 +1,134 @@
 import asyncio
 import json
 import logging
-import re
-from datetime import datetime
+import sys
+import threading
 import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Iterator
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.llm import get_llm_client
-from app.models.cv import CV
+from app.core.llm import complete, get_llm_client, stream_completion_text, structured_output
+from app.core.metrics import DEDUP_RATIO, PREFILTER_RATIO, SOURCE_RESULTS
+from app.core.tokens import count_tokens, model_limits, truncate_to_tokens
+from app.core.tracing import set_attributes, span
+from app.ai_engine.explainability.explanation import verdict_for
+from app.ai_engine.scoring.batcher import pack_batches
+from app.agents.refresh_context import RefreshContext
 from app.models.job import Job
-from app.models.user import User
-from app.models.user_job_profile import UserJobProfile
 from app.services.search.adzuna import AdzunaService
 from app.services.search.arbeitnow import ArbeitnowService
 from app.services.search.france_travail import FranceTravailService
+from app.services.search.http import create_http_client
 from app.services.search.jobspy_scraper import JobSpyScraper
 from app.services.search.normalizer import JobNormalizer
 from app.services.search.remotive import RemotiveService
+from app.utils.json_stream import JSONArrayStream, parse_llm_json
 
 logger = logging.getLogger(__name__)
 
+# How many times missing scores of a batch are re-requested before per-job scoring
+SCORING_MAX_REREQUESTS = 1
+
+# Expected output tokens per job, used to pack batches and size max_tokens
+SCORE_OUTPUT_TOKENS_COMPACT = 16
+SCORE_OUTPUT_TOKENS_DETAILED = 160
+# Chat formatting and the "Jobs:" wrapper around the batch
+SCORING_PROMPT_OVERHEAD_TOKENS = 32
+# Shortest prefix providers cache (OpenAI and most Anthropic models); below it
+# marking the system prompt cacheable only adds cache-write cost
+PROMPT_CACHE_MIN_TOKENS = 1024
+# Contact details say nothing about the match and are kept out of the prompts
+_CV_CONTACT_FIELDS = ("full_name", "email", "phone")
+
+COMPACT_SCORES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "scores": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"i": {"type": "integer"}, "s": {"type": "integer"}},
+                "required": ["i", "s"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["scores"],
+    "additionalProperties": False,
+}
+
+DETAILED_SCORES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "scores": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "score": {"type": "integer"},
+                    "matching_skills": {"type": "array", "items": {"type": "string"}},
+                    "missing_skills": {"type": "array", "items": {"type": "string"}},
+                    "verdict": {"type": "string", "enum": ["strong_match", "good_match", "weak_match", "no_match"]},
+                    "summary": {"type": "string"},
+                },
+                "required": ["index", "score", "matching_skills", "missing_skills", "verdict", "summary"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["scores"],
+    "additionalProperties": False,
+}
+
+
+def _expand_compact_score(result: dict) -> dict:
+    """{"i": 3, "s": 72} → the usual score_result shape, without explanations."""
+    try:
+        score = int(result.get("s", 0))
+    except (TypeError, ValueError):
+        score = 0
+    return {
+        "index": result.get("i"),
+        "score": score,
+        "matching_skills": [],
+        "missing_skills": [],
+        "verdict": verdict_for(score),
+    }
+
 
 class SearchAgent:
 
     def __init__(self):
         self.client = get_llm_client()
-        self.france_travail = FranceTravailService()
-        self.adzuna = AdzunaService()
-        self.arbeitnow = ArbeitnowService()
-        self.remotive = RemotiveService()
+        # One event loop for the agent's lifetime so the pooled HTTP client
+        # (bound to the loop it first runs on) keeps its connections warm.
+        self._loop = asyncio.new_event_loop()
+        self.http = create_http_client()
+        self.france_travail = FranceTravailService(self.http)
+        self.adzuna = AdzunaService(self.http)
+        self.arbeitnow = ArbeitnowService(self.http)
+        self.remotive = RemotiveService(self.http)
         self.jobspy = JobSpyScraper()
-        self.normalizer = JobNormalizer()
+        self.normalizer = JobNormalizer(self.client)
+
+    def close(self) -> None:
+        self.jobspy.close()
+        try:
+            self._loop.run_until_complete(self.http.aclose())
+        finally:
+            self._loop.close()
 
     def analyze_profile(self, profile: dict) -> dict:
+        with span("analyze_profile"):
+            return self._analyze_profile(profile)
+
+    def _analyze_profile(self, profile: dict) -> dict:
         try:
             prompt = (
                 "You are a senior HR expert. Generate the best search keywords for this candidate profile. "
@@ -43,47 +136,67 @@ class SearchAgent:
                 '{"primary_keywords": "string", "secondary_keywords": ["..."], "synonyms": ["..."]}\n\n'
                 f"Profile: {json.dumps(profile, ensure_ascii=False)}"
             )
-            resp = self.client.chat.completions.create(
+            resp = complete(
+                self.client,
                 model=settings.LLM_MODEL_FAST,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0,
             )
-            raw = resp.choices[0].message.content.strip()
-            raw = re.sub(r"^```json|^```|```$", "", raw).strip()
-            return json.loads(raw)
+            return parse_llm_json(resp.choices[0].message.content)
         except Exception as e:
             logger.warning(f"analyze_profile error: {e}")
             return {"primary_keywords": profile.get("target_role", "")}
 
     async def search_all(self, keywords: str, location: str) -> list[dict]:
+        with span("search_all", keywords=keywords, location=location) as search_span:
+            jobs = await self._search_all(keywords, location)
+            set_attributes(search_span, jobs=len(jobs))
+            return jobs
+
+    @staticmethod
+    async def _traced_source(source: str, search) -> list[dict]:
+        """One "search.source" span around a source's search coroutine."""
+        with span("search.source", source=source) as source_span:
+            jobs = await search
+            set_attributes(source_span, jobs=len(jobs or []))
+            return jobs
+
+    async def _search_all(self, keywords: str, location: str) -> list[dict]:
+        jobs = []
+
         tasks = [
-            self.france_travail.search(keywords, location),
-            self.adzuna.search(keywords, location),
-            self.arbeitnow.search(keywords),
-            self.remotive.search(keywords),
+            self._traced_source("france_travail", self.france_travail.search(keywords, location)),
+            self._traced_source("adzuna", self.adzuna.search(keywords, location)),
+            self._traced_source("arbeitnow", self.arbeitnow.search(keywords)),
+            self._traced_source("remotive", self.remotive.search(keywords)),
+            self._traced_source("jobspy", self.jobspy.search(keywords, location)),
         ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        jobs = []
         for r in results:
             if isinstance(r, Exception):
                 logger.warning(f"Search source error: {r}")
                 continue
-            jobs.extend(r)
+            if r:
+                jobs.extend(r)
 
-        try:
-            loop = asyncio.get_event_loop()
-            jobspy_results = await loop.run_in_executor(
-                None, lambda: self.jobspy.scrape(keywords, location)
-            )
-            jobs.extend(jobspy_results)
-        except Exception as e:
-            logger.warning(f"JobSpy error: {e}")
+        per_source = Counter(job.get("source") for job in jobs)
+        for source in ("france_travail", "adzuna", "arbeitnow", "remotive", *self.jobspy.sites):
+            SOURCE_RESULTS.labels(source=source).observe(per_source.get(source, 0))
 
-        jobs = self.normalizer.deduplicate(jobs)
+        fetched = len(jobs)
+        jobs = self._deduplicate(jobs)
+        if fetched:
+            DEDUP_RATIO.observe(len(jobs) / fetched)
         logger.info(f"search_all total after dedup: {len(jobs)}")
         return jobs
 
+    def _deduplicate(self, jobs: list[dict]) -> list[dict]:
+        with span("deduplicate", jobs_in=len(jobs)) as dedup_span:
+            unique = self.normalizer.deduplicate(jobs)
+            set_attributes(dedup_span, jobs_out=len(unique))
+            return unique
+
     def _pre_filter(self, job: dict, profile_dict: dict) -> bool:
         target_role = profile_dict.get("target_role") or ""
         skills = profile_dict.get("skills") or []
@@ -100,44 +213,218 @@ class SearchAgent:
         ]).lower()
         return any(word in job_text for word in target_words)
 
-    def score_jobs_batch(self, cv_structured: dict, jobs: list[dict]) -> list[dict]:
-        cv_summary = {
-            "years_experience": cv_structured.get("years_experience", 0),
-            "skills": cv_structured.get("skills", [])[:15],
-            "current_title": (cv_structured.get("experiences") or [{}])[0].get("title", ""),
+    @staticmethod
+    def _cv_profile(cv_structured: dict) -> dict:
+        """
+        The whole structured CV (experience descriptions, education...) for
+        batch scoring: it is sent once per refresh in the cached prefix, so
+        unlike score_job's summary its size is paid for only once.
+        """
+        return {
+            key: value for key, value in cv_structured.items()
+            if key not in _CV_CONTACT_FIELDS and value not in (None, "", [], {})
         }
-        jobs_list = [
+
+    @staticmethod
+    def _scoring_instructions(detailed: bool) -> str:
+        if detailed:
+            return (
+                "You are a senior HR expert. Score each CV/job match below.\n"
+                "Return ONLY a JSON object with one entry per job:\n"
+                '{"scores":[{"index":0,"score":0-100,"matching_skills":[],"missing_skills":[],'
+                '"verdict":"strong_match|good_match|weak_match|no_match","summary":"string"}, ...]}\n\n'
+            )
+        return (
+            "You are a senior HR expert. Score each CV/job match below from 0 to 100.\n"
+            "Return ONLY a JSON object, no explanations:\n"
+            '{"scores":[{"i":0,"s":0-100}, ...]}\n\n'
+        )
+
+    def _stream_batch_scores(
+        self,
+        system_prompt: str,
+        entries: list[dict],
+        indices: list[int],
+        detailed: bool,
+        max_tokens: int,
+        cache_prefix: bool,
+    ) -> Iterator[dict]:
+        """
+        Stream the scores of entries[indices]; each object is yielded as soon as it closes.
+        The compact variant only asks for {"i": index, "s": score} per job.
+        """
+        if detailed:
+            output_format = structured_output("job_match_details", DETAILED_SCORES_SCHEMA)
+        else:
+            output_format = structured_output("job_match_scores", COMPACT_SCORES_SCHEMA)
+        jobs_list = [entries[i] for i in indices]
+        parser = JSONArrayStream()
+        # Stable prefix first (instructions + CV, identical for every batch of
+        # this user's refresh) so the provider can serve it from its prompt cache.
+        for delta in stream_completion_text(
+            self.client,
+            cache_prefix=cache_prefix,
+            model=settings.LLM_MODEL_FAST,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Jobs: {json.dumps(jobs_list, ensure_ascii=False)}"},
+            ],
+            temperature=0,
+            max_tokens=max_tokens,
+            **output_format,
+        ):
+            for result in parser.feed(delta):
+                if detailed:
+                    yield result
+                else:
+                    yield _expand_compact_score(result)
+
+    def _iter_pass(
+        self,
+        cv_structured: dict,
+        jobs: list[dict],
+        entries: list[dict],
+        entry_tokens: list[int],
+        indices: list[int],
+        detailed: bool,
+    ) -> Iterator[tuple[int, dict]]:
+        """
+        One scoring pass over jobs[indices], packed into requests by token
+        budget. A truncated or malformed stream keeps its parsed prefix; only
+        the missing indices are re-requested, then scored one by one.
+        """
+        model = settings.LLM_MODEL_FAST
+        limits = model_limits(model)
+        system_prompt = (
+            self._scoring_instructions(detailed)
+            + f"CV: {json.dumps(self._cv_profile(cv_structured), ensure_ascii=False)}"
+        )
+        prefix_tokens = count_tokens(system_prompt, model)
+        cache_prefix = prefix_tokens >= PROMPT_CACHE_MIN_TOKENS
+        per_job_output = SCORE_OUTPUT_TOKENS_DETAILED if detailed else SCORE_OUTPUT_TOKENS_COMPACT
+        batches = pack_batches(
+            input_tokens=[entry_tokens[i] for i in indices],
+            output_tokens=[per_job_output] * len(indices),
+            fixed_input_tokens=prefix_tokens + SCORING_PROMPT_OVERHEAD_TOKENS,
+            limits=limits,
+            max_items=settings.SCORING_MAX_BATCH_JOBS,
+        )
+        logger.info(
+            f"Scoring pass ({'detailed' if detailed else 'compact'}): "
+            f"{len(indices)} jobs in {len(batches)} requests, "
+            f"prefix {prefix_tokens} tokens{' (cacheable)' if cache_prefix else ''}"
+        )
+
+        for batch_number, positions in enumerate(batches):
+            pending = [indices[p] for p in positions]
+            # run() drains this generator, so each span closes before the next batch starts
+            with span("score_jobs_batch", detailed=detailed, batch=batch_number, jobs=len(pending)) as batch_span:
+                for attempt in range(1 + SCORING_MAX_REREQUESTS):
+                    if attempt:
+                        logger.info(f"Re-requesting {len(pending)}/{len(positions)} missing scores")
+                    waiting = set(pending)
+                    # Headroom over the estimate, never above what the model can emit
+                    max_tokens = min(limits.max_output, int(per_job_output * len(pending) * 1.5) + 256)
+                    try:
+                        for result in self._stream_batch_scores(
+                            system_prompt, entries, pending, detailed, max_tokens, cache_prefix
+                        ):
+                            index = result.get("index")
+                            if isinstance(index, str) and index.isdigit():
+                                index = int(index)
+                            if index in waiting:
+                                waiting.discard(index)
+                                yield index, result
+                    except Exception as e:
+                        logger.warning(f"Batch scoring stream interrupted with {len(waiting)} jobs unscored: {e}")
+                    pending = [i for i in pending if i in waiting]
+                    if not pending:
+                        break
+                set_attributes(batch_span, attempts=attempt + 1, fallback_jobs=len(pending))
+                if pending:
+                    logger.warning(f"Falling back to individual scoring for {len(pending)} jobs")
+                    for i in pending:
+                        yield i, self.score_job(cv_structured, jobs[i])
+
+    def _scoring_entries(self, jobs: list[dict]) -> tuple[list[dict], list[int]]:
+        """Prompt entry per job (description capped in tokens) and its token count."""
+        model = settings.LLM_MODEL_FAST
+        entries = [
             {
                 "index": i,
                 "title": job.get("title"),
                 "skills_required": (job.get("skills_required") or [])[:10],
-                "description": (job.get("description") or "")[:300],
+                "description": truncate_to_tokens(
+                    job.get("description") or "", settings.SCORING_DESCRIPTION_TOKENS, model
+                ),
             }
             for i, job in enumerate(jobs)
         ]
-        prompt = (
-            "You are a senior HR expert. Score each CV/job match below.\n"
-            "Return ONLY a JSON array with one object per job:\n"
-            '[{"index":0,"score":0-100,"matching_skills":[],"missing_skills":[],'
-            '"verdict":"strong_match|good_match|weak_match|no_match","summary":"string"}, ...]\n\n'
-            f"CV: {json.dumps(cv_summary, ensure_ascii=False)}\n"
-            f"Jobs: {json.dumps(jobs_list, ensure_ascii=False)}"
-        )
-        resp = self.client.chat.completions.create(
-            model=settings.LLM_MODEL_FAST,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-        )
-        raw = resp.choices[0].message.content.strip()
-        raw = re.sub(r"^```json|^```|```$", "", raw, flags=re.MULTILINE).strip()
-        results_by_index = {r["index"]: r for r in json.loads(raw)}
-        return [
-            results_by_index.get(i, {
-                "score": 0, "matching_skills": [], "missing_skills": [],
-                "verdict": "no_match", "summary": "",
-            })
-            for i in range(len(jobs))
-        ]
+        tokens = [count_tokens(json.dumps(entry, ensure_ascii=False), model) for entry in entries]
+        return entries, tokens
+
+    def iter_scores(self, cv_structured: dict, jobs: list[dict]) -> Iterator[tuple[int, dict]]:
+        """
+        Yield (index, score_result) for every job as soon as it is scored.
+
+        In two_pass mode every job first gets a compact numeric score; match
+        explanations are only requested for jobs at or above JOB_SAVE_MIN_SCORE,
+        the only ones whose details are ever stored.
+        """
+        entries, entry_tokens = self._scoring_entries(jobs)
+        indices = list(range(len(jobs)))
+        if settings.SCORING_MODE != "two_pass":
+            yield from self._iter_pass(cv_structured, jobs, entries, entry_tokens, indices, detailed=True)
+            return
+
+        candidates = []
+        for index, result in self._iter_pass(cv_structured, jobs, entries, entry_tokens, indices, detailed=False):
+            # Results from the per-job fallback already carry a summary
+            if result.get("score", 0) >= settings.JOB_SAVE_MIN_SCORE and "summary" not in result:
+                candidates.append(index)
+            else:
+                yield index, result
+        if candidates:
+            logger.info(f"Two-pass scoring: details for {len(candidates)}/{len(jobs)} jobs")
+            yield from self._iter_pass(cv_structured, jobs, entries, entry_tokens, candidates, detailed=True)
+
+    def iter_engine_scores(
+        self, context: RefreshContext, cv_structured: dict, jobs: list[dict]
+    ) -> Iterator[tuple[int, dict]]:
+        """
+        Scores per SCORING_ENGINE:
+
+          llm    → every job is scored by the LLM
+          local  → local re-ranker only, no LLM call
+          hybrid → local re-ranker first; only the best SCORING_HYBRID_MAX_LLM_JOBS
+                   at or above SCORING_HYBRID_MIN_LOCAL_SCORE go to the LLM
+        """
+        engine = settings.SCORING_ENGINE
+        if engine == "llm":
+            yield from self.iter_scores(cv_structured, jobs)
+            return
+
+        from app.ai_engine.scoring.scorer import get_local_scorer  # numpy, only for local/hybrid
+        local_results = get_local_scorer().score_jobs(context, jobs)
+        if engine == "local":
+            yield from enumerate(local_results)
+            return
+
+        ranked = sorted(range(len(jobs)), key=lambda i: local_results[i]["score"], reverse=True)
+        shortlist = [
+            i for i in ranked if local_results[i]["score"] >= settings.SCORING_HYBRID_MIN_LOCAL_SCORE
+        ][:settings.SCORING_HYBRID_MAX_LLM_JOBS]
+        logger.info(f"Hybrid scoring: {len(shortlist)}/{len(jobs)} jobs sent to the LLM")
+        shortlisted = set(shortlist)
+        for i in range(len(jobs)):
+            if i not in shortlisted:
+                yield i, local_results[i]
+        for position, result in self.iter_scores(cv_structured, [jobs[i] for i in shortlist]):
+            yield shortlist[position], result
+
+    def score_jobs_batch(self, cv_structured: dict, jobs: list[dict]) -> list[dict]:
+        results = dict(self.iter_scores(cv_structured, jobs))
+        return [results[i] for i in range(len(jobs))]
 
     def score_job(self, cv_structured: dict, job: dict) -> dict:
         try:
@@ -159,109 +446,88 @@ class SearchAgent:
                 f"CV: {json.dumps(cv_summary, ensure_ascii=False)}\n"
                 f"Job: {json.dumps(job_summary, ensure_ascii=False)}"
             )
-            resp = self.client.chat.completions.create(
+            resp = complete(
+                self.client,
                 model=settings.LLM_MODEL_FAST,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0,
             )
-            raw = resp.choices[0].message.content.strip()
-            raw = re.sub(r"^```json|^```|```$", "", raw).strip()
-            return json.loads(raw)
+            return parse_llm_json(resp.choices[0].message.content)
         except Exception as e:
             logger.warning(f"score_job error: {e}")
-            return {"score": 0, "matching_skills": [], "missing_skills": [], "verdict": "no_match", "summary": ""}
-
-    def run(self, user_id: uuid.UUID, db: Session) -> dict:
-        # if isinstance(user_id, str):
-        #     user_id = uuid.UUID(user_id)
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user or not user.is_active:
-            logger.warning(f"User {user_id} not found or inactive")
-            return {"new_jobs": 0, "total_searched": 0}
-
-        cv = db.query(CV).filter(CV.user_id == user_id).order_by(CV.version.desc()).first()
-        if not cv:
-            logger.warning(f"No CV for user {user_id}")
-            return {"new_jobs": 0, "total_searched": 0}
-
-        profile = db.query(UserJobProfile).filter(UserJobProfile.user_id == user_id).first()
-        if not profile:
-            logger.warning(f"No job profile for user {user_id}")
-            return {"new_jobs": 0, "total_searched": 0}
-
-        profile_dict = {
-            "target_role": profile.target_role,
-            "location": profile.location,
-            "skills": profile.skills,
-            "years_experience": profile.years_experience,
-        }
+            # failed: not an LLM judgement, kept out of the scoring samples
+            return {
+                "score": 0, "matching_skills": [], "missing_skills": [], "verdict": "no_match", "summary": "",
+                "failed": True,
+            }
+
+    def run(self, context: RefreshContext, db: Session) -> dict:
+        user_id = context.user_id
+        profile_dict = context.profile_dict
 
         keywords_data = self.analyze_profile(profile_dict)
-        primary_keywords = keywords_data.get("primary_keywords", profile.target_role)
+        primary_keywords = keywords_data.get("primary_keywords", context.target_role)
         secondary_keywords = keywords_data.get("secondary_keywords", [])
 
-        loop = asyncio.new_event_loop()
-        try:
-            all_jobs = loop.run_until_complete(self.search_all(primary_keywords, profile.location))
-            for kw in secondary_keywords[:2]:
-                extra = loop.run_until_complete(self.search_all(kw, profile.location))
-                all_jobs.extend(extra)
-        finally:
-            loop.close()
+        all_jobs = self._loop.run_until_complete(self.search_all(primary_keywords, context.location))
+        for kw in secondary_keywords[:2]:
+            extra = self._loop.run_until_complete(self.search_all(kw, context.location))
+            all_jobs.extend(extra)
 
-        jobs = self.normalizer.deduplicate(all_jobs)
+        jobs = self._deduplicate(all_jobs)
         logger.info(f"Total jobs after multi-keyword search + dedup: {len(jobs)}")
 
-        cv_structured = cv.data or {}
-        new_jobs_count = 0
+        cv_structured = context.cv_data or {}
 
-        BATCH_SIZE = 20
         logger.info(f"Starting pre-filter on {len(jobs)} jobs, profile: target_role={profile_dict.get('target_role')!r}, skills={profile_dict.get('skills')}")
-        try:
-            filtered = [j for j in jobs if self._pre_filter(j, profile_dict)]
-        except Exception as e:
-            logger.error(f"Pre-filter crashed: {e}", exc_info=True)
-            filtered = jobs
+        with span("pre_filter", user_id=str(user_id), jobs_in=len(jobs)) as filter_span:
+            try:
+                filtered = [j for j in jobs if self._pre_filter(j, profile_dict)]
+            except Exception as e:
+                logger.error(f"Pre-filter crashed: {e}", exc_info=True)
+                filtered = jobs
+            set_attributes(filter_span, jobs_out=len(filtered))
         logger.info(f"Pre-filter: {len(jobs)} → {len(filtered)} jobs")
+        if jobs:
+            PREFILTER_RATIO.observe(len(filtered) / len(jobs))
 
         scored_pairs: list[tuple[dict, dict]] = []
-        for i in range(0, len(filtered), BATCH_SIZE):
-            batch = filtered[i:i + BATCH_SIZE]
-            try:
-                score_results = self.score_jobs_batch(cv_structured, batch)
-            except Exception as e:
-                logger.warning(f"Batch scoring error, falling back to individual scoring: {e}")
-                score_results = [self.score_job(cv_structured, j) for j in batch]
-            scored_pairs.extend(zip(batch, score_results))
+        with span("score_jobs", user_id=str(user_id), engine=settings.SCORING_ENGINE, jobs=len(filtered)):
+            for index, score_result in self.iter_engine_scores(context, cv_structured, filtered):
+                scored_pairs.append((filtered[index], score_result))
 
         above_threshold = sum(1 for _, s in scored_pairs if s.get("score", 0) >= 30)
         logger.info(f"Scoring done: {len(scored_pairs)} jobs scored, {above_threshold} above threshold (>=30)")
 
-        for job_data, score_result in scored_pairs:
+        with span("persist_jobs", user_id=str(user_id)) as persist_span:
+            new_job_ids = self._persist(db, user_id, scored_pairs)
+            set_attributes(persist_span, new_jobs=len(new_job_ids))
+        if settings.SCORING_ENGINE != "local":
+            self._record_scoring_samples(db, context, scored_pairs)
+        logger.info(f"User {user_id}: {len(new_job_ids)} new jobs saved from {len(jobs)} searched")
+        return {"new_jobs": len(new_job_ids), "total_searched": len(jobs), "new_job_ids": new_job_ids}
+
+    def _persist(self, db: Session, user_id, scored_pairs: list[tuple[dict, dict]]) -> list[str]:
+        """Save the jobs above JOB_SAVE_MIN_SCORE not already stored; returns the new ids."""
+        to_save = [(j, s) for j, s in scored_pairs if s.get("score", 0) >= settings.JOB_SAVE_MIN_SCORE]
+        existing_keys, existing_urls = self._existing_job_keys(db, user_id, [j for j, _ in to_save])
+        set_attributes(to_save=len(to_save))
+
+        new_jobs: list[Job] = []
+        for job_data, score_result in to_save:
             score = score_result.get("score", 0)
-
-            logger.info(f"Job '{job_data.get('title')}' score: {score}")
-            print(f"Job '{job_data.get('title')}' score: {score}")
-            
-            if score < 60:
-                continue
-
             external_id = job_data.get("external_id")
             if external_id is not None:
-                existing = db.query(Job).filter(
-                    Job.user_id == user_id,
-                    Job.external_id == external_id,
-                    Job.source == job_data.get("source"),
-                ).first()
+                key = (str(external_id), job_data.get("source"))
+                if key in existing_keys:
+                    continue
+                existing_keys.add(key)
             else:
                 url = job_data.get("url")
-                existing = db.query(Job).filter(
-                    Job.user_id == user_id,
-                    Job.url == url,
-                ).first() if url else None
-
-            if existing:
-                continue
+                if url and url in existing_urls:
+                    continue
+                if url:
+                    existing_urls.add(url)
 
             published_at = None
             if job_data.get("published_at"):
@@ -270,7 +536,9 @@ class SearchAgent:
                 except Exception:
                     pass
 
-            new_job = Job(
+            new_jobs.append(Job(
+                # Explicit id: known without a reload after commit
+                id=uuid.uuid4(),
                 user_id=user_id,
                 external_id=job_data.get("external_id"),
                 source=job_data.get("source"),
@@ -288,14 +556,89 @@ class SearchAgent:
                 match_score=score,
                 match_details=score_result,
                 published_at=published_at,
-            )
-            db.add(new_job)
-            new_jobs_count += 1
+            ))
 
+        new_job_ids = [str(job.id) for job in new_jobs]
+        db.add_all(new_jobs)
         try:
             db.commit()
         except IntegrityError:
             db.rollback()
+            new_job_ids = []
             logger.warning(f"Commit failed due to duplicate constraint, rolling back")
-        logger.info(f"User {user_id}: {new_jobs_count} new jobs saved from {len(jobs)} searched")
-        return {"new_jobs": new_jobs_count, "total_searched": len(jobs)}
\ No newline at end of file
+        return new_job_ids
+
+    @staticmethod
+    def _record_scoring_samples(db: Session, context: RefreshContext, scored_pairs: list[tuple[dict, dict]]) -> None:
+        """Training data for the local re-ranker: every LLM score, saved job or not."""
+        from app.ai_engine.scoring.scorer import record_scoring_samples  # numpy
+        try:
+            recorded = record_scoring_samples(
+                db, context, [(job, result) for job, result in scored_pairs if not result.get("failed")]
+            )
+            logger.info(f"Recorded {recorded} scoring samples")
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not record scoring samples: {e}")
+
+    @staticmethod
+    def _existing_job_keys(db: Session, user_id, jobs: list[dict]) -> tuple[set, set]:
+        """
+        (external_id, source) pairs and URLs already stored for these jobs,
+        in two queries instead of one per job.
+        """
+        external_ids = {str(j["external_id"]) for j in jobs if j.get("external_id") is not None}
+        urls = {j["url"] for j in jobs if j.get("external_id") is None and j.get("url")}
+        keys, known_urls = set(), set()
+        if external_ids:
+            keys = {
+                (external_id, source)
+                for external_id, source in db.query(Job.external_id, Job.source).filter(
+                    Job.user_id == user_id, Job.external_id.in_(external_ids)
+                )
+            }
+        if urls:
+            known_urls = {
+                url for (url,) in db.query(Job.url).filter(Job.user_id == user_id, Job.url.in_(urls))
+            }
+        return keys, known_urls
+
+_agent: SearchAgent | None = None
+
+
+def _green_pool() -> str | None:
+    gevent = sys.modules.get("gevent.monkey")
+    if gevent and gevent.is_module_patched("threading"):
+        return "gevent"
+    eventlet = sys.modules.get("eventlet.patcher")
+    if eventlet and eventlet.is_monkey_patched("thread"):
+        return "eventlet"
+    return None
+
+
+def get_search_agent() -> SearchAgent:
+    """
+    Process-wide SearchAgent. Celery workers build it in worker_process_init;
+    any other caller gets it lazily on first use.
+
+    The agent owns one event loop (and the HTTP pool bound to it) and runs
+    one refresh at a time, so it needs one task per process: Celery's
+    prefork (default) or solo pool, not -P threads / gevent / eventlet.
+    """
+    global _agent
+    pool = _green_pool() or (None if threading.current_thread() is threading.main_thread() else "threads")
+    if pool:
+        raise RuntimeError(
+            f"SearchAgent cannot run under the {pool} pool: start the refresh workers "
+            f"with the prefork (default) or solo pool"
+        )
+    if _agent is None:
+        _agent = SearchAgent()
+    return _agent
+
+
+def close_search_agent() -> None:
+    global _agent
+    if _agent is not None:
+        _agent.close()
+        _agent = None
@@ -0,0 +1,13 @@
+"""
+Human-readable labels for match scores.
+"""
+
+
+def verdict_for(score: int) -> str:
+    if score >= 80:
+        return "strong_match"
+    if score >= 60:
+        return "good_match"
+    if score >= 30:
+        return "weak_match"
+    return "no_match"
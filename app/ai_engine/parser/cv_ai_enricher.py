@@ -1,60 +1,74 @@
 """
-AI-based CV enricher using OpenAI GPT-4.
+AI-based CV enricher using the shared LLM client (app.core.llm).
 Receives raw text from PDF/Image OCR and returns structured CVSchema.
+Long CVs are split into sections parsed in parallel, then merged.
 """
 
-import re
+from concurrent.futures import ThreadPoolExecutor
 from app.schemas.cv import CVParseResponse, CVSchema, Experience, Education
 from typing import Optional
 import json
-from app.utils.prompts import generate_cv_parsing_prompt
+from app.utils.prompts import generate_cv_parsing_prompt, generate_cv_section_parsing_prompt
+from app.utils.json_stream import parse_llm_json
+from app.utils.text import clean_cv_text, split_cv_sections
 from app.core.config import settings
-from openai import OpenAI
-from dotenv import load_dotenv
+from app.core.llm import complete, get_llm_client
 import logging
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-def _clean_json(text: str) -> str:
-    """
-    Remove markdown fences ```json ... ``` from LLM output.
-    """
-    text = text.strip()
-    text = re.sub(r"^```json", "", text)
-    text = re.sub(r"^```", "", text)
-    text = re.sub(r"```$", "", text)
-    return text.strip()
-
-
-def enrich_cv_with_llm(raw_text: str, email: Optional[str] = None) -> CVParseResponse:
-    """
-    Call DEEPSEEK to extract structured CV information.
-    """
-    prompt = generate_cv_parsing_prompt(raw_text)
+SCALAR_FIELDS = ("full_name", "email", "phone", "location", "summary")
 
-    client = OpenAI(api_key=settings.DEEPSEEK_API_KEY, base_url="https://api.deepseek.com")
 
-    # Call OpenAI ChatCompletion
-    response = client.chat.completions.create(
-        model="deepseek-chat",
+def _complete_json(prompt: str) -> dict:
+    response = complete(
+        get_llm_client(),
+        model=settings.LLM_MODEL_FAST,
         messages=[{"role": "user", "content": prompt}],
         temperature=0
     )
+    return parse_llm_json(response.choices[0].message.content)
 
-    # Get text output
-    ai_output = response.choices[0].message.content
 
-    # DEBUG
-    # logging.info("===== LLM RAW OUTPUT =====")
-    # logging.info(ai_output)
-    # logging.info("===== END LLM OUTPUT =====")
+def _merge_sections(first: dict, others: list[dict]) -> dict:
+    """
+    Scalars come from the first part that has them; lists are concatenated
+    without duplicates.
+    """
+    merged = dict(first)
+    for part in others:
+        for field in SCALAR_FIELDS:
+            if not merged.get(field) and part.get(field):
+                merged[field] = part[field]
+        for field in ("skills", "experience", "education"):
+            seen = {json.dumps(item, sort_keys=True).lower() for item in merged.get(field) or []}
+            for item in part.get(field) or []:
+                key = json.dumps(item, sort_keys=True).lower()
+                if key not in seen:
+                    seen.add(key)
+                    merged.setdefault(field, []).append(item)
+    return merged
 
-    ai_output = _clean_json(ai_output)
+
+def enrich_cv_with_llm(raw_text: str, email: Optional[str] = None) -> CVParseResponse:
+    """
+    Call the configured LLM to extract structured CV information.
+    """
+    text = clean_cv_text(raw_text)
+    sections = split_cv_sections(text, settings.CV_CHUNK_CHARS)
 
     # Parse JSON safely
     try:
-        ai_json = json.loads(ai_output)
-        # print(ai_json)
+        if len(sections) == 1:
+            ai_json = _complete_json(generate_cv_parsing_prompt(text))
+            extra_parts = []
+        else:
+            logger.info(f"Long CV ({len(text)} chars): parsing {len(sections)} sections in parallel")
+            prompts = [generate_cv_parsing_prompt(sections[0])] + [
+                generate_cv_section_parsing_prompt(section) for section in sections[1:]
+            ]
+            with ThreadPoolExecutor(max_workers=min(len(prompts), settings.CV_CHUNK_WORKERS)) as pool:
+                ai_json, *extra_parts = pool.map(_complete_json, prompts)
     except json.JSONDecodeError:
         # fallback: empty CVSchema
         return CVParseResponse(
@@ -69,7 +83,7 @@ def enrich_cv_with_llm(raw_text: str, email: Optional[str] = None) -> CVParseRes
         )
 
     # Build CVSchema object
-    data_json = ai_json.get("data", {})
+    data_json = _merge_sections(ai_json.get("data") or {}, extra_parts)
 
     cv = CVSchema(
         full_name=data_json.get("full_name"),
@@ -90,4 +104,3 @@ def enrich_cv_with_llm(raw_text: str, email: Optional[str] = None) -> CVParseRes
         is_cv=True,
         data=cv
     )
-
@@ -0,0 +1,41 @@
+"""
+Token-budget batching for LLM scoring.
+"""
+
+from app.core.tokens import ModelLimits
+
+
+def pack_batches(
+    input_tokens: list[int],
+    output_tokens: list[int],
+    fixed_input_tokens: int,
+    limits: ModelLimits,
+    max_items: int,
+    context_fill: float = 0.9,
+) -> list[list[int]]:
+    """
+    Greedily pack items (by position) into batches such that each request
+    fits the model: prompt + expected output within `context_fill` of the
+    context window, and expected output within the model's output limit.
+    An item too large on its own still gets a batch of its own.
+    """
+    context_budget = int(limits.context * context_fill)
+    batches: list[list[int]] = []
+    current: list[int] = []
+    used_in = fixed_input_tokens
+    used_out = 0
+    for i, (tok_in, tok_out) in enumerate(zip(input_tokens, output_tokens)):
+        fits = (
+            len(current) < max_items
+            and used_in + tok_in + used_out + tok_out <= context_budget
+            and used_out + tok_out <= limits.max_output
+        )
+        if current and not fits:
+            batches.append(current)
+            current, used_in, used_out = [], fixed_input_tokens, 0
+        current.append(i)
+        used_in += tok_in
+        used_out += tok_out
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,211 @@
+"""
+Rule-based match features between a user's profile/CV and job offers.
+
+Every feature is in [0, 1]; 0.5 means "unknown" (the offer does not say).
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+
+FEATURE_NAMES = [
+    "skill_coverage",      # share of the job's required skills the user has
+    "skill_overlap",       # Jaccard of user and job skills
+    "description_skills",  # share of the user's skills mentioned in the description
+    "title_similarity",
+    "seniority_fit",
+    "location_fit",
+    "remote_fit",
+    "contract_fit",
+    "salary_fit",
+]
+
+SKILL_SYNONYMS = {
+    "js": "javascript",
+    "ts": "typescript",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "golang": "go",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "py": "python",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "gcp": "google cloud",
+    "aws": "amazon web services",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "dotnet": ".net",
+    "scikit-learn": "sklearn",
+}
+
+_WORD = re.compile(r"[a-z0-9+#.]+")
+_YEARS_REQUIRED = re.compile(r"(\d{1,2})\s*\+?\s*(?:ans|an|years?|yrs?)", re.IGNORECASE)
+_TITLE_SENIORITY = [
+    (re.compile(r"\b(intern|stagiaire|stage|alternan\w*|apprenti\w*)\b", re.IGNORECASE), 0),
+    (re.compile(r"\b(junior|débutant|entry)\b", re.IGNORECASE), 1),
+    (re.compile(r"\b(senior|confirmé|expérimenté)\b", re.IGNORECASE), 5),
+    (re.compile(r"\b(lead|principal|staff|head|architect\w*|manager)\b", re.IGNORECASE), 7),
+]
+_CONTRACT_ALIASES = {
+    "cdi": "permanent", "permanent": "permanent", "full-time": "permanent", "fulltime": "permanent",
+    "full_time": "permanent",
+    "cdd": "temporary", "temporary": "temporary", "contract": "temporary", "mis": "temporary",
+    "freelance": "freelance", "contractor": "freelance", "independent": "freelance",
+    "stage": "internship", "internship": "internship",
+    "alternance": "apprenticeship", "apprenticeship": "apprenticeship",
+    "part-time": "part_time", "parttime": "part_time", "part_time": "part_time",
+}
+_STOPWORDS = {"de", "du", "des", "la", "le", "les", "et", "en", "h/f", "f/h", "m/f", "and", "the", "of"}
+
+
+def normalize_skill(skill: str) -> str:
+    skill = " ".join(str(skill).lower().split())
+    return SKILL_SYNONYMS.get(skill, skill)
+
+
+def _skill_set(skills) -> set[str]:
+    return {normalize_skill(s) for s in skills or [] if s}
+
+
+def _words(text: str) -> set[str]:
+    return {w for w in _WORD.findall((text or "").lower()) if w not in _STOPWORDS and len(w) > 1}
+
+
+@lru_cache(maxsize=512)
+def _term_pattern(term: str) -> re.Pattern:
+    """`term` as a whole word or phrase; the boundaries also hold for c#, c++, .net."""
+    return re.compile(rf"(?<![a-z0-9+#]){re.escape(term)}(?![a-z0-9+#])")
+
+
+def _contains_term(text: str, term: str) -> bool:
+    return bool(_term_pattern(term).search(text))
+
+
+def _contract_kind(value: str) -> str | None:
+    value = (value or "").lower().strip()
+    return _CONTRACT_ALIASES.get(value) or next(
+        (kind for alias, kind in _CONTRACT_ALIASES.items() if _contains_term(value, alias)), None
+    )
+
+
+def _skill_tokens(text: str) -> set[str]:
+    """Single-word skills mentioned in a text, normalized like profile skills (one-letter ones included)."""
+    return {normalize_skill(token.rstrip(".")) for token in _WORD.findall(text)}
+
+
+def mentioned_skills(skills: set[str], description: str) -> set[str]:
+    """
+    Skills mentioned as whole words: "go" is not found in "good", "java" not
+    in "javascript", "sql" not in "nosql". Synonyms count ("ML" for machine learning).
+    """
+    tokens = _skill_tokens(description)
+    return {
+        skill for skill in skills
+        if skill in tokens or (" " in skill and _contains_term(description, skill))
+    }
+
+
+def required_years(job: dict) -> int | None:
+    """Years of experience the offer asks for: explicit in the description, else implied by the title."""
+    match = _YEARS_REQUIRED.search((job.get("description") or "")[:3000])
+    if match and int(match.group(1)) <= 20:
+        return int(match.group(1))
+    for pattern, years in reversed(_TITLE_SENIORITY):
+        if pattern.search(job.get("title") or ""):
+            return years
+    return None
+
+
+class MatchProfile:
+    """The user side of the features, computed once per refresh."""
+
+    def __init__(self, context):
+        cv_data = context.cv_data or {}
+        self.skills = _skill_set(list(context.skills or []) + list(cv_data.get("skills") or []))
+        self.years = context.years_experience or cv_data.get("years_experience") or 0
+        self.title_words = _words(context.target_role)
+        self.location_words = _words(context.location)
+        self.remote_preference = (context.remote_preference or "any").lower()
+        self.contracts = {_contract_kind(c) for c in context.contract_preference or []} - {None}
+        self.min_salary = context.min_salary
+
+
+def skill_match(profile: MatchProfile, job: dict) -> tuple[list[str], list[str]]:
+    """(matching, missing) skills of a job, for the score explanation."""
+    required = _skill_set(job.get("skills_required"))
+    return sorted(required & profile.skills), sorted(required - profile.skills)
+
+
+def _job_features(profile: MatchProfile, job: dict) -> list[float]:
+    required = _skill_set(job.get("skills_required"))
+    description = (job.get("description") or "").lower()
+
+    if required:
+        coverage = len(required & profile.skills) / len(required)
+        overlap = len(required & profile.skills) / len(required | profile.skills)
+    else:
+        coverage = overlap = 0.5
+    if profile.skills and description:
+        mentioned = len(mentioned_skills(profile.skills, description)) / len(profile.skills)
+    else:
+        mentioned = 0.5
+
+    title_words = _words(job.get("title"))
+    if profile.title_words and title_words:
+        title = len(profile.title_words & title_words) / len(profile.title_words)
+    else:
+        title = 0.5
+
+    years = required_years(job)
+    if years is None:
+        seniority = 0.5
+    else:
+        # Missing years cost more than extra ones
+        gap = years - profile.years
+        seniority = max(0.0, 1 - gap / 5) if gap > 0 else max(0.0, 1 + gap / 10)
+
+    job_location = _words(job.get("location"))
+    is_remote = "remote" in (job.get("remote") or "").lower() or "télétravail" in (job.get("remote") or "").lower()
+    if is_remote:
+        location = 1.0
+    elif profile.location_words and job_location:
+        location = 1.0 if profile.location_words & job_location else 0.0
+    else:
+        location = 0.5
+
+    if profile.remote_preference == "any":
+        remote = 1.0
+    elif not job.get("remote"):
+        remote = 0.5
+    elif profile.remote_preference in ("remote", "hybrid"):
+        remote = 1.0 if is_remote else 0.3
+    else:
+        remote = 0.3 if is_remote else 1.0
+
+    kind = _contract_kind(job.get("contract"))
+    if not profile.contracts:
+        contract = 1.0
+    elif kind is None:
+        contract = 0.5
+    else:
+        contract = 1.0 if kind in profile.contracts else 0.0
+
+    offered = job.get("salary_max") or job.get("salary_min")
+    if not profile.min_salary or not offered:
+        salary = 0.5
+    else:
+        salary = min(1.0, offered / profile.min_salary)
+
+    return [coverage, overlap, mentioned, title, seniority, location, remote, contract, salary]
+
+
+def match_features(profile: MatchProfile, jobs: list[dict]) -> np.ndarray:
+    """(len(jobs), len(FEATURE_NAMES)) feature matrix."""
+    if not jobs:
+        return np.zeros((0, len(FEATURE_NAMES)))
+    return np.array([_job_features(profile, job) for job in jobs], dtype=float)
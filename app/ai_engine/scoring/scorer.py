@@ -0,0 +1,172 @@
+"""
+Local (LLM-free) job scoring.
+
+A linear model over the rule features in rules.py. It starts from
+hand-tuned weights and can be refitted (ridge regression) on ScoringSample
+rows: the features and LLM score of every job the LLM scored, including
+those below JOB_SAVE_MIN_SCORE that are never saved as jobs. The fitted
+weights live in Redis so every worker picks them up.
+"""
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.ai_engine.explainability.explanation import verdict_for
+from app.ai_engine.scoring.rules import FEATURE_NAMES, MatchProfile, match_features, skill_match
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.models.scoring_sample import ScoringSample
+
+logger = logging.getLogger(__name__)
+
+MODEL_KEY = "scoring:local_model"
+# How often a worker checks Redis for newly trained weights
+MODEL_RELOAD_SECONDS = 3600
+
+# Hand-tuned weights on a 0-100 scale, used until a model has been trained
+DEFAULT_WEIGHTS = {
+    "skill_coverage": 35.0,
+    "skill_overlap": 5.0,
+    "description_skills": 10.0,
+    "title_similarity": 20.0,
+    "seniority_fit": 10.0,
+    "location_fit": 8.0,
+    "remote_fit": 4.0,
+    "contract_fit": 4.0,
+    "salary_fit": 4.0,
+}
+
+
+class LocalScorer:
+
+    def __init__(self, weights: dict | None = None, bias: float = 0.0, trained_on: int = 0):
+        weights = weights or DEFAULT_WEIGHTS
+        self.weights = np.array([weights.get(name, 0.0) for name in FEATURE_NAMES], dtype=float)
+        self.bias = bias
+        self.trained_on = trained_on
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        if not len(features):
+            return np.zeros(0, dtype=int)
+        return np.clip(features @ self.weights + self.bias, 0, 100).round().astype(int)
+
+    def score_jobs(self, context, jobs: list[dict]) -> list[dict]:
+        """score_result dicts (same shape as the LLM ones) for every job."""
+        profile = MatchProfile(context)
+        scores = self.predict(match_features(profile, jobs))
+        results = []
+        for job, score in zip(jobs, scores.tolist()):
+            matching, missing = skill_match(profile, job)
+            results.append({
+                "score": score,
+                "matching_skills": matching,
+                "missing_skills": missing,
+                "verdict": verdict_for(score),
+                "summary": f"{len(matching)} of {len(matching) + len(missing)} required skills matched.",
+                "engine": "local",
+            })
+        return results
+
+    def fit(self, features: np.ndarray, targets: np.ndarray, l2: float = 1.0) -> "LocalScorer":
+        """Ridge regression; the bias is not regularized."""
+        x = np.hstack([features, np.ones((len(features), 1))])
+        penalty = l2 * np.eye(x.shape[1])
+        penalty[-1, -1] = 0.0
+        solution = np.linalg.solve(x.T @ x + penalty, x.T @ targets)
+        self.weights, self.bias = solution[:-1], float(solution[-1])
+        self.trained_on = len(targets)
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "weights": dict(zip(FEATURE_NAMES, self.weights.tolist())),
+            "bias": self.bias,
+            "trained_on": self.trained_on,
+            "trained_at": datetime.utcnow().isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LocalScorer":
+        return cls(weights=data["weights"], bias=data.get("bias", 0.0), trained_on=data.get("trained_on", 0))
+
+
+_scorer: LocalScorer | None = None
+_loaded_at = 0.0
+
+
+def get_local_scorer() -> LocalScorer:
+    """Process-wide scorer, refreshed from Redis at most every MODEL_RELOAD_SECONDS."""
+    global _scorer, _loaded_at
+    if _scorer is not None and time.monotonic() - _loaded_at < MODEL_RELOAD_SECONDS:
+        return _scorer
+    scorer = None
+    try:
+        raw = get_redis().get(MODEL_KEY)
+        if raw:
+            scorer = LocalScorer.from_dict(json.loads(raw))
+    except Exception as e:
+        logger.warning(f"Could not load local scoring model, using default weights: {e}")
+    _scorer = scorer or _scorer or LocalScorer()
+    _loaded_at = time.monotonic()
+    return _scorer
+
+
+def record_scoring_samples(db: Session, context, scored_pairs: list[tuple[dict, dict]]) -> int:
+    """
+    Store features + LLM score of every LLM-scored job of a refresh, in one
+    bulk insert. Scores from the local model itself are skipped.
+    """
+    pairs = [(job, result) for job, result in scored_pairs if result.get("engine") != "local"]
+    if not pairs:
+        return 0
+    features = match_features(MatchProfile(context), [job for job, _ in pairs])
+    now = datetime.utcnow()
+    db.bulk_insert_mappings(ScoringSample, [
+        {
+            "id": uuid.uuid4(),
+            "user_id": context.user_id,
+            "features": dict(zip(FEATURE_NAMES, row)),
+            "llm_score": float(result.get("score", 0) or 0),
+            "created_at": now,
+        }
+        for row, (_, result) in zip(features.tolist(), pairs)
+    ])
+    db.commit()
+    return len(pairs)
+
+
+def train_local_scorer(db: Session) -> dict | None:
+    """
+    Fit the local model on the most recent scoring samples and publish it.
+    Samples older than LOCAL_SCORER_SAMPLE_RETENTION_DAYS are deleted first.
+    """
+    global _scorer, _loaded_at
+    cutoff = datetime.utcnow() - timedelta(days=settings.LOCAL_SCORER_SAMPLE_RETENTION_DAYS)
+    db.query(ScoringSample).filter(ScoringSample.created_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+
+    rows = (
+        db.query(ScoringSample.features, ScoringSample.llm_score)
+        .order_by(ScoringSample.created_at.desc())
+        .limit(settings.LOCAL_SCORER_TRAIN_LIMIT)
+        .all()
+    )
+    # Samples recorded before a feature was added don't have it
+    rows = [(f, score) for f, score in rows if all(name in f for name in FEATURE_NAMES)]
+    if len(rows) < settings.LOCAL_SCORER_MIN_SAMPLES:
+        logger.info(f"Local scorer: {len(rows)} scoring samples, need {settings.LOCAL_SCORER_MIN_SAMPLES}")
+        return None
+
+    features = np.array([[f[name] for name in FEATURE_NAMES] for f, _ in rows], dtype=float)
+    targets = np.array([score for _, score in rows], dtype=float)
+    scorer = LocalScorer().fit(features, targets)
+    model = scorer.to_dict()
+    get_redis().set(MODEL_KEY, json.dumps(model))
+    _scorer, _loaded_at = scorer, time.monotonic()
+    logger.info(f"Local scorer trained on {len(targets)} samples: {model['weights']} bias={scorer.bias:.1f}")
+    return model
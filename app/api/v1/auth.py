@@ -1,6 +1,5 @@
-from app.core.auth import get_current_user
-from app.db.session import get_db
-from app.models.user import User
+from app.core.auth import AuthUser, get_current_user
+from app.db.session import get_async_db, get_db
 from app.schemas.user import ChangePasswordSchema, ForgotPasswordSchema, ResetPasswordSchema
 from app.services.auth_service import (
     change_user_password,
@@ -17,20 +16,22 @@ from app.services.auth_service import (
 from fastapi import APIRouter, Cookie, Depends, Response
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+# Password endpoints are async: the argon2 hash is awaited, holding no request thread
 @router.post("/token")
-def login(
+async def login(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
     device_id: str | None = Cookie(default=None),
     device_name: str | None = Cookie(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return login_user(form_data, device_id, device_name, db, response)
+    return await login_user(form_data, device_id, device_name, db, response)
 
 
 @router.get("/google/login")
@@ -54,17 +55,17 @@ def forgot_password(payload: ForgotPasswordSchema, db: Session = Depends(get_db)
 
 
 @router.post("/reset_password")
-def reset_password(payload: ResetPasswordSchema, db: Session = Depends(get_db)):
-    return reset_password_with_token(payload, db)
+async def reset_password(payload: ResetPasswordSchema, db: AsyncSession = Depends(get_async_db)):
+    return await reset_password_with_token(payload, db)
 
 
 @router.post("/change_password")
-def change_password(
+async def change_password(
     payload: ChangePasswordSchema,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user),
 ):
-    return change_user_password(payload, current_user, db)
+    return await change_user_password(payload, current_user, db)
 
 
 @router.post("/refresh")
@@ -90,7 +91,7 @@ def logout(
 def logout_all(
     response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ):
     return logout_all_devices(current_user, db, response)
 
@@ -98,6 +99,6 @@ def logout_all(
 @router.get("/sessions")
 def get_sessions(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ):
     return list_user_sessions(current_user, db)
\ No newline at end of file
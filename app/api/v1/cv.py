@@ -2,17 +2,12 @@
 CV endpoints: upload or manual creation.
 """
 import logging
-import shutil
-from pathlib import Path
-import tempfile
-from app.ai_engine.parser.cv_ai_enricher import enrich_cv_with_llm
 from app.db.session import get_db
 from app.models.cv import CV
-from app.services.cv_service import create_manual_cv, process_uploaded_cv
+from app.services.cv_service import create_manual_cv, get_cv_upload_status, process_uploaded_cv
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from app.utils.ocr import extract_text_from_pdf, extract_text_from_image
 # from app.ai_engine.parser.cv_parser import parse_cv_text
-from app.schemas.cv import CVParseResponse, CVSchema
+from app.schemas.cv import CVSchema, CVUploadAccepted, CVUploadStatus
 from app.core.auth import get_current_user
 from sqlalchemy.orm import Session
 
@@ -21,17 +16,21 @@ router = APIRouter(
     tags=["CVs"]
 )
 
-# Configuration
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-@router.post("/upload", response_model=CVParseResponse,)
-async def upload_cv(file: UploadFile = File(...), db: Session = Depends(get_db),current_user=Depends(get_current_user)):
+@router.post("/upload", response_model=CVUploadAccepted, status_code=202)
+async def upload_cv(file: UploadFile = File(...), current_user=Depends(get_current_user)):
     """
     Upload a CV file (PDF / JPG / PNG) from web app.
-    Extract text and enrich via GPT-4.
+    Text extraction and AI enrichment run on the CV workers;
+    poll GET /cvs/upload/{job_id} for the result.
+    """
+    return await process_uploaded_cv(file, current_user)
+
+@router.get("/upload/{job_id}", response_model=CVUploadStatus)
+def get_upload_status(job_id: str, current_user=Depends(get_current_user)):
+    """
+    Status of a CV upload; `result` is set once parsing has succeeded.
     """
-    return await process_uploaded_cv(file, current_user, db)
+    return get_cv_upload_status(job_id, current_user)
 
 @router.post("/manual", response_model=CVSchema)
 def create_cv_manually(
@@ -3,15 +3,15 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.auth import get_current_user
-from app.db.session import get_db
+from app.celery_app import celery
+from app.core.auth import AuthUser, get_current_user
+from app.db.session import get_async_db, get_db
 from app.models.job import Job
-from app.models.user import User
 from app.schemas.job import JobListOut, JobOut, JobStatsOut
-from app.tasks.jobs_tasks import refresh_jobs_for_user
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
 
 @router.get("/", response_model=JobListOut)
-def list_jobs(
+async def list_jobs(
     min_score: Optional[float] = None,
     source: Optional[str] = None,
     contract: Optional[str] = None,
@@ -27,58 +27,64 @@ def list_jobs(
     is_saved: Optional[bool] = None,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user),
 ):
-    query = db.query(Job).filter(Job.user_id == current_user.id)
+    filters = [Job.user_id == current_user.id]
 
     if min_score is not None:
-        query = query.filter(Job.match_score >= min_score)
+        filters.append(Job.match_score >= min_score)
     if source:
-        query = query.filter(Job.source == source)
+        filters.append(Job.source == source)
     if contract:
-        query = query.filter(Job.contract == contract)
+        filters.append(Job.contract == contract)
     if remote:
-        query = query.filter(Job.remote == remote)
+        filters.append(Job.remote == remote)
     if is_saved is not None:
-        query = query.filter(Job.is_saved == is_saved)
+        filters.append(Job.is_saved == is_saved)
 
-    total = query.count()
-    jobs = query.order_by(Job.match_score.desc()).offset(skip).limit(limit).all()
+    total = await db.scalar(select(func.count(Job.id)).where(*filters))
+    jobs = (
+        await db.scalars(
+            select(Job).where(*filters).order_by(Job.match_score.desc()).offset(skip).limit(limit)
+        )
+    ).all()
 
-    return JobListOut(total=total, jobs=jobs)
+    return JobListOut(total=total or 0, jobs=jobs)
 
 
 @router.get("/stats", response_model=JobStatsOut)
-def get_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user),
 ):
-    base = db.query(Job).filter(Job.user_id == current_user.id)
-
-    total = base.count()
-    seen = base.filter(Job.is_seen == True).count()
-    saved = base.filter(Job.is_saved == True).count()
-    avg_score = db.query(func.avg(Job.match_score)).filter(Job.user_id == current_user.id).scalar() or 0.0
+    mine = Job.user_id == current_user.id
+
+    # One pass for the counters instead of one query each
+    totals = (
+        await db.execute(
+            select(
+                func.count(Job.id),
+                func.sum(case((Job.is_seen == True, 1), else_=0)),
+                func.sum(case((Job.is_saved == True, 1), else_=0)),
+                func.avg(Job.match_score),
+            ).where(mine)
+        )
+    ).one()
+    total, seen, saved, avg_score = totals
 
     by_source_rows = (
-        db.query(Job.source, func.count(Job.id))
-        .filter(Job.user_id == current_user.id)
-        .group_by(Job.source)
-        .all()
-    )
+        await db.execute(select(Job.source, func.count(Job.id)).where(mine).group_by(Job.source))
+    ).all()
     by_contract_rows = (
-        db.query(Job.contract, func.count(Job.id))
-        .filter(Job.user_id == current_user.id)
-        .group_by(Job.contract)
-        .all()
-    )
+        await db.execute(select(Job.contract, func.count(Job.id)).where(mine).group_by(Job.contract))
+    ).all()
 
     return JobStatsOut(
-        total=total,
-        seen=seen,
-        saved=saved,
-        avg_score=round(float(avg_score), 1),
+        total=total or 0,
+        seen=seen or 0,
+        saved=saved or 0,
+        avg_score=round(float(avg_score or 0.0), 1),
         by_source={source: count for source, count in by_source_rows if source},
         by_contract={contract: count for contract, count in by_contract_rows if contract},
     )
@@ -88,7 +94,7 @@ def get_stats(
 def get_job(
     job_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ):
     job = db.query(Job).filter(Job.id == job_id, Job.user_id == current_user.id).first()
     if not job:
@@ -104,7 +110,7 @@ def get_job(
 def toggle_save(
     job_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ):
     job = db.query(Job).filter(Job.id == job_id, Job.user_id == current_user.id).first()
     if not job:
@@ -117,7 +123,8 @@ def toggle_save(
 
 @router.post("/refresh")
 def trigger_refresh(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ):
-    refresh_jobs_for_user.delay(str(current_user.id))
+    # By name: importing the task module would pull the whole search/scoring stack into the API
+    celery.send_task("app.tasks.jobs_tasks.refresh_jobs_for_user", args=[str(current_user.id)])
     return {"message": "Job refresh started"}
\ No newline at end of file
@@ -2,14 +2,15 @@ import logging
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.auth import get_current_user
-from app.db.session import get_db
-from app.models.user import User
+from app.celery_app import celery
+from app.core.auth import AuthUser, get_current_user
+from app.db.session import get_async_db, get_db
 from app.models.user_job_profile import UserJobProfile
 from app.schemas.profile import UserJobProfileCreate, UserJobProfileOut
-from app.tasks.jobs_tasks import refresh_jobs_for_user
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,7 @@ router = APIRouter(prefix="/profile", tags=["Profile"])
 def upsert_profile(
     payload: UserJobProfileCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ):
     profile = db.query(UserJobProfile).filter(UserJobProfile.user_id == current_user.id).first()
 
@@ -49,17 +50,18 @@ def upsert_profile(
     db.commit()
     db.refresh(profile)
 
-    refresh_jobs_for_user.delay(str(current_user.id))
+    # By name: importing the task module would pull the whole search/scoring stack into the API
+    celery.send_task("app.tasks.jobs_tasks.refresh_jobs_for_user", args=[str(current_user.id)])
 
     return profile
 
 
 @router.get("/", response_model=UserJobProfileOut)
-def get_profile(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_profile(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user),
 ):
-    profile = db.query(UserJobProfile).filter(UserJobProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(UserJobProfile).where(UserJobProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     return profile
\ No newline at end of file
@@ -1,7 +1,8 @@
 from uuid import UUID
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.schemas.user import UserCreate, UserRead
 from app.services.user_service import activate_user, get_user_by_id, register_user
 
@@ -11,8 +12,9 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=UserRead)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    return register_user(user, db)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Async: the password hash is awaited, holding no request thread
+    return await register_user(user, db)
 
 @router.get("/activate")
 def activate_account(token: str, db: Session = Depends(get_db)):
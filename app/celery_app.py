@@ -1,19 +1,57 @@
+import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_shutdown
 from app.core.config import settings
 
 celery = Celery(
     "ai_job_assistant",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["app.tasks.jobs_tasks"],
+    include=["app.tasks.jobs_tasks", "app.tasks.cv_tasks", "app.tasks.token_tasks", "app.tasks.email_tasks"],
 )
 
+# CV parsing and email run on their own queues so they are not stuck behind refresh batches
+celery.conf.task_routes = {
+    "app.tasks.cv_tasks.*": {"queue": "cv"},
+    "app.tasks.email_tasks.*": {"queue": "email"},
+}
+celery.conf.task_track_started = True
+
 celery.conf.beat_schedule = {
     "refresh-all-users-every-6h": {
         "task": "app.tasks.jobs_tasks.refresh_all_users",
         "schedule": crontab(hour="*/6"),
     },
+    "train-local-scoring-model-daily": {
+        "task": "app.tasks.jobs_tasks.train_local_scoring_model",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "flush-refresh-token-usage-every-minute": {
+        "task": "app.tasks.token_tasks.flush_refresh_token_usage",
+        "schedule": 60.0,
+    },
+    "send-job-digests": {
+        "task": "app.tasks.email_tasks.send_job_digests",
+        "schedule": settings.DIGEST_INTERVAL_MINUTES * 60.0,
+    },
+    "cleanup-refresh-tokens-hourly": {
+        "task": "app.tasks.token_tasks.cleanup_refresh_tokens",
+        "schedule": crontab(minute=30),
+    },
 }
 
-celery.conf.timezone = "UTC"
\ No newline at end of file
+celery.conf.timezone = "UTC"
+
+@worker_init.connect
+def start_metrics_exporter(**_):
+    # Parent process only; prefork children write to PROMETHEUS_MULTIPROC_DIR
+    if settings.METRICS_WORKER_PORT:
+        from app.core.metrics import start_worker_exporter
+        start_worker_exporter(settings.METRICS_WORKER_PORT)
+
+
+@worker_process_shutdown.connect
+def release_process_metrics(**_):
+    from app.core.metrics import mark_process_dead
+    mark_process_dead(os.getpid())
@@ -1,18 +1,113 @@
-from datetime import timedelta
+import json
+import logging
+import time
 import uuid
+from dataclasses import asdict, dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 
 from app.models.user import User  # ton modèle user
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal
 from app.core.config import settings
-from sqlalchemy.orm import Session
+from app.core.metrics import CACHE_REQUESTS
+from app.core.redis_client import get_async_redis, get_redis
 
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+AUTH_CACHE_PREFIX = "auth:user:"
+_LOCAL_CACHE_MAX = 10_000
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """
+    The authenticated principal: the users-table fields endpoints read,
+    served from cache. Load the User row to modify it.
+    """
+    id: uuid.UUID
+    email: str
+    full_name: str | None
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthUser":
+        return cls(id=user.id, email=user.email, full_name=user.full_name, is_active=bool(user.is_active))
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "id": str(self.id)})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "AuthUser":
+        data = json.loads(raw)
+        data["id"] = uuid.UUID(data["id"])
+        return cls(**data)
+
+
+# user_id → (expires_at, AuthUser); short TTL since other processes can't invalidate it
+_local_cache: dict[uuid.UUID, tuple[float, AuthUser]] = {}
+
+
+def invalidate_auth_cache(user_id) -> None:
+    """Call whenever a user's auth state changes (activation, password, revoked sessions)."""
+    user_id = uuid.UUID(str(user_id))
+    _local_cache.pop(user_id, None)
+    try:
+        get_redis().delete(f"{AUTH_CACHE_PREFIX}{user_id}")
+    except Exception as e:
+        logger.warning(f"Auth cache invalidation failed for {user_id}: {e}")
+
+
+async def ainvalidate_auth_cache(user_id) -> None:
+    """invalidate_auth_cache for async code."""
+    user_id = uuid.UUID(str(user_id))
+    _local_cache.pop(user_id, None)
+    try:
+        await get_async_redis().delete(f"{AUTH_CACHE_PREFIX}{user_id}")
+    except Exception as e:
+        logger.warning(f"Auth cache invalidation failed for {user_id}: {e}")
+
+
+def _cache_local(auth_user: AuthUser) -> None:
+    if len(_local_cache) >= _LOCAL_CACHE_MAX:
+        _local_cache.clear()
+    _local_cache[auth_user.id] = (time.monotonic() + settings.AUTH_CACHE_LOCAL_TTL, auth_user)
+
+
+async def _load_auth_user(user_id: uuid.UUID) -> AuthUser | None:
+    cached = _local_cache.get(user_id)
+    if cached and cached[0] > time.monotonic():
+        CACHE_REQUESTS.labels(cache="auth", result="local_hit").inc()
+        return cached[1]
+
+    key = f"{AUTH_CACHE_PREFIX}{user_id}"
+    try:
+        raw = await get_async_redis().get(key)
+        if raw:
+            auth_user = AuthUser.from_json(raw)
+            _cache_local(auth_user)
+            CACHE_REQUESTS.labels(cache="auth", result="hit").inc()
+            return auth_user
+    except Exception as e:
+        logger.warning(f"Auth cache read failed, falling back to the database: {e}")
+
+    CACHE_REQUESTS.labels(cache="auth", result="miss").inc()
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+    if user is None:
+        return None
+    auth_user = AuthUser.from_user(user)
+    _cache_local(auth_user)
+    try:
+        await get_async_redis().set(key, auth_user.to_json(), ex=settings.AUTH_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Auth cache write failed for {user_id}: {e}")
+    return auth_user
+
+
+def _user_id_from_token(token: str) -> uuid.UUID:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id = payload.get("sub")
@@ -20,12 +115,16 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
-    user_id = uuid.UUID(user_id)
-    
-    user = db.query(User).filter(User.id == user_id).first()
+    return uuid.UUID(user_id)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> AuthUser:
+    user_id = _user_id_from_token(token)
+    user = await _load_auth_user(user_id)
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    
+
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account not activated")
     return user
+
@@ -14,13 +14,63 @@ class Settings:
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # Argon2 cost (memory in KiB); changing them rehashes passwords on next login
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "1"))
+    # Hashing pool: one worker per core, a short queue, then 503
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "16"))
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2"))
+    # Rows deleted per transaction by the periodic refresh-token cleanup
+    REFRESH_TOKEN_CLEANUP_BATCH: int = int(os.getenv("REFRESH_TOKEN_CLEANUP_BATCH", "1000"))
+    # Cached auth state of a user (seconds): per process, then Redis
+    AUTH_CACHE_LOCAL_TTL: int = int(os.getenv("AUTH_CACHE_LOCAL_TTL", "10"))
+    AUTH_CACHE_TTL: int = int(os.getenv("AUTH_CACHE_TTL", "300"))
 
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    # Derived from DATABASE_URL (asyncpg / aiosqlite) unless set
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+    # Log every statement (development only)
+    DB_ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
+    DB_SLOW_QUERY_MS: int = int(os.getenv("DB_SLOW_QUERY_MS", "200"))
+    # Same statement this many times in one request/task → logged as a possible N+1
+    DB_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "10"))
     
     # App
     APP_NAME: str = os.getenv("APP_NAME", "AI Job Assistant")
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    # Prometheus exporter of a Celery worker (0 = disabled; one port per worker
+    # on a host); the API serves /metrics
+    METRICS_WORKER_PORT: int = int(os.getenv("METRICS_WORKER_PORT", "0"))
+    # Refresh tracing: none | otlp | file (see app/core/tracing.py)
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none").lower()
+    TRACING_FILE: str = os.getenv("TRACING_FILE", "traces.jsonl")
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "aijobassistant-worker")
+    # Uploaded CVs waiting for the CV workers (must be shared with them)
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+
+    # CV text extraction / OCR
+    OCR_DPI: int = int(os.getenv("OCR_DPI", "300"))
+    # Scanned pages OCRed in parallel (tesseract processes) from PDF_PARALLEL_MIN_PAGES pages on
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "3"))
+    CV_CHUNK_CHARS: int = int(os.getenv("CV_CHUNK_CHARS", "6000"))
+    CV_CHUNK_WORKERS: int = int(os.getenv("CV_CHUNK_WORKERS", "4"))
+    CV_CACHE_TTL: int = int(os.getenv("CV_CACHE_TTL", str(30 * 24 * 3600)))
+    # Tesseract languages; each needs its traineddata on the CV workers
+    # (e.g. "eng+fra" once tesseract-ocr-fra is installed)
+    OCR_LANGUAGES: str = os.getenv("OCR_LANGUAGES", "eng")
+    OCR_PSM: int = int(os.getenv("OCR_PSM", "3"))  # 3 = fully automatic page segmentation
+    OCR_DESKEW: bool = os.getenv("OCR_DESKEW", "True").lower() == "true"
+    OCR_DESKEW_MAX_ANGLE: float = float(os.getenv("OCR_DESKEW_MAX_ANGLE", "5"))
+    OCR_DESKEW_STEP: float = float(os.getenv("OCR_DESKEW_STEP", "0.5"))
     
     # API Keys (legacy)
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -33,16 +83,66 @@ class Settings:
     LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
     LLM_MODEL_FAST: str = os.getenv("LLM_MODEL_FAST", "gpt-4o-mini")
     LLM_MODEL_SMART: str = os.getenv("LLM_MODEL_SMART", "gpt-4o")
+    # Structured output: "json_schema" | "json_object" | "none" (see app.core.llm.structured_output)
+    LLM_STRUCTURED_OUTPUT: str = os.getenv("LLM_STRUCTURED_OUTPUT", "json_object")
+    # Ask OpenAI-compatible providers for token usage at the end of streams
+    LLM_STREAM_USAGE: bool = os.getenv("LLM_STREAM_USAGE", "True").lower() == "true"
+
+    # Job scoring
+    # SCORING_MODE: "two_pass" (compact scores, then details above the save threshold) | "single_pass"
+    SCORING_MODE: str = os.getenv("SCORING_MODE", "two_pass")
+    JOB_SAVE_MIN_SCORE: int = int(os.getenv("JOB_SAVE_MIN_SCORE", "60"))
+    # SCORING_ENGINE: "llm" | "local" (rule features + trained re-ranker, no LLM) | "hybrid" (local first stage)
+    SCORING_ENGINE: str = os.getenv("SCORING_ENGINE", "llm")
+    SCORING_HYBRID_MIN_LOCAL_SCORE: int = int(os.getenv("SCORING_HYBRID_MIN_LOCAL_SCORE", "40"))
+    SCORING_HYBRID_MAX_LLM_JOBS: int = int(os.getenv("SCORING_HYBRID_MAX_LLM_JOBS", "40"))
+    LOCAL_SCORER_MIN_SAMPLES: int = int(os.getenv("LOCAL_SCORER_MIN_SAMPLES", "200"))
+    LOCAL_SCORER_TRAIN_LIMIT: int = int(os.getenv("LOCAL_SCORER_TRAIN_LIMIT", "20000"))
+    LOCAL_SCORER_SAMPLE_RETENTION_DAYS: int = int(os.getenv("LOCAL_SCORER_SAMPLE_RETENTION_DAYS", "60"))
+    SCORING_MAX_BATCH_JOBS: int = int(os.getenv("SCORING_MAX_BATCH_JOBS", "50"))
+    SCORING_DESCRIPTION_TOKENS: int = int(os.getenv("SCORING_DESCRIPTION_TOKENS", "400"))
+    # JSON overrides of context / output limits per model prefix, e.g.
+    # {"gpt-4o-mini": {"context": 128000, "max_output": 16384}}
+    LLM_MODEL_LIMITS: str = os.getenv("LLM_MODEL_LIMITS", "")
+    # JSON overrides of USD prices per million tokens, e.g.
+    # {"gpt-4o-mini": {"input": 0.15, "output": 0.6, "cached_input": 0.075}}
+    LLM_MODEL_PRICES: str = os.getenv("LLM_MODEL_PRICES", "")
 
     # Job search APIs
     FRANCE_TRAVAIL_CLIENT_ID: str = os.getenv("FRANCE_TRAVAIL_CLIENT_ID", "")
     FRANCE_TRAVAIL_CLIENT_SECRET: str = os.getenv("FRANCE_TRAVAIL_CLIENT_SECRET", "")
     ADZUNA_APP_ID: str = os.getenv("ADZUNA_APP_ID", "")
     ADZUNA_APP_KEY: str = os.getenv("ADZUNA_APP_KEY", "")
+    SEARCH_HTTP_MAX_CONNECTIONS: int = int(os.getenv("SEARCH_HTTP_MAX_CONNECTIONS", "50"))
+    SEARCH_HTTP_MAX_KEEPALIVE: int = int(os.getenv("SEARCH_HTTP_MAX_KEEPALIVE", "20"))
+
+    # JobSpy scraping (one pool thread per site, JOBSPY_MAX_WORKERS at once)
+    JOBSPY_SITES: list[str] = os.getenv("JOBSPY_SITES", "indeed,glassdoor,linkedin,google").split(",")
+    JOBSPY_MAX_WORKERS: int = int(os.getenv("JOBSPY_MAX_WORKERS", "4"))
+    JOBSPY_SITE_TIMEOUT: float = float(os.getenv("JOBSPY_SITE_TIMEOUT", "60"))
+
+    # Per-source circuit breakers and adaptive timeouts (seconds)
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_ERROR_RATE: float = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+    CIRCUIT_WINDOW: int = int(os.getenv("CIRCUIT_WINDOW", "50"))
+    CIRCUIT_MIN_SAMPLES: int = int(os.getenv("CIRCUIT_MIN_SAMPLES", "10"))
+    CIRCUIT_COOLDOWN_SECONDS: int = int(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "60"))
+    # Max wait for the breaker state / search cache before failing open or missing (seconds)
+    CIRCUIT_REDIS_TIMEOUT: float = float(os.getenv("CIRCUIT_REDIS_TIMEOUT", "0.25"))
+    SOURCE_TIMEOUT_MIN: float = float(os.getenv("SOURCE_TIMEOUT_MIN", "3"))
+    SOURCE_TIMEOUT_MAX: float = float(os.getenv("SOURCE_TIMEOUT_MAX", "15"))
+    SOURCE_TIMEOUT_P95_FACTOR: float = float(os.getenv("SOURCE_TIMEOUT_P95_FACTOR", "2.0"))
+
+    # Upstream search response cache: "redis" | "disk" | "none"
+    SEARCH_CACHE_BACKEND: str = os.getenv("SEARCH_CACHE_BACKEND", "redis")
+    SEARCH_CACHE_DIR: str = os.getenv("SEARCH_CACHE_DIR", ".cache/search")
+    SEARCH_CACHE_TTL: int = int(os.getenv("SEARCH_CACHE_TTL", "900"))
+    SEARCH_CACHE_STALE_TTL: int = int(os.getenv("SEARCH_CACHE_STALE_TTL", "86400"))
 
     # Celery / Redis
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+    REDIS_URL: str = os.getenv("REDIS_URL", CELERY_BROKER_URL)
 
     # Google OAuth2
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
@@ -54,6 +154,12 @@ class Settings:
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
     SMTP_USERNAME: str = os.getenv("SMTP_USERNAME", "")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    SMTP_TIMEOUT: int = int(os.getenv("SMTP_TIMEOUT", "30"))
+
+    # New-match digest emails
+    DIGEST_INTERVAL_MINUTES: int = int(os.getenv("DIGEST_INTERVAL_MINUTES", "360"))
+    DIGEST_MAX_JOBS: int = int(os.getenv("DIGEST_MAX_JOBS", "10"))
+    DIGEST_USERS_PER_BATCH: int = int(os.getenv("DIGEST_USERS_PER_BATCH", "200"))
 
     # FRONTEND settings
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "")
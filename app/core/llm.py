@@ -1,26 +1,150 @@
+import json
 import logging
-from openai import OpenAI
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterator
 from app.core.config import settings
+from app.core.metrics import LLM_COST_USD, LLM_REQUEST_SECONDS, LLM_TOKENS
+from app.core.tokens import model_limits, usage_cost
+from app.core.tracing import set_attributes, span
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_llm_client():
     """
     Returns a unified LLM client with a consistent chat.completions.create() interface.
 
+    The client is created once per process and shared: it owns an HTTP
+    connection pool, so callers must not build their own. Forked workers
+    call get_llm_client.cache_clear() to get a fresh pool.
+
     Providers:
       LLM_PROVIDER=openai    → OpenAI / DeepSeek / Groq / Mistral / Ollama (OpenAI-compatible)
       LLM_PROVIDER=anthropic → Anthropic Claude (native SDK, adapted to match OpenAI interface)
     """
     if settings.LLM_PROVIDER == "anthropic":
         return _AnthropicAdapter(api_key=settings.LLM_API_KEY)
+    from openai import OpenAI  # heavy import, deferred to first use
     return OpenAI(
         api_key=settings.LLM_API_KEY,
         base_url=settings.LLM_BASE_URL,
     )
 
 
+def structured_output(name: str, schema: dict) -> dict:
+    """
+    Extra chat.completions.create() kwargs asking for JSON matching `schema`
+    (a JSON Schema whose root is an object), per LLM_STRUCTURED_OUTPUT:
+
+      json_schema → provider-enforced schema (OpenAI structured outputs;
+                    forced tool call through the Anthropic adapter)
+      json_object → JSON mode only (DeepSeek and most OpenAI-compatible APIs)
+      none        → rely on the prompt
+    """
+    mode = settings.LLM_STRUCTURED_OUTPUT
+    if mode == "json_schema":
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": name, "schema": schema, "strict": True},
+            }
+        }
+    if mode == "json_object":
+        return {"response_format": {"type": "json_object"}}
+    return {}
+
+
+# Per-process token totals by model, including prompt-cache hits
+LLM_USAGE: dict[str, dict[str, float]] = defaultdict(
+    lambda: {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0}
+)
+
+
+def record_usage(model: str, usage) -> dict:
+    """
+    Normalize a usage object (OpenAI, DeepSeek or the Anthropic adapter)
+    and add it to LLM_USAGE and the Prometheus token / cost counters.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    counts = {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "cached_tokens": (
+            getattr(details, "cached_tokens", None)              # OpenAI
+            or getattr(usage, "prompt_cache_hit_tokens", None)   # DeepSeek
+            or getattr(usage, "cached_tokens", None)             # Anthropic adapter
+            or 0
+        ),
+    }
+    cost = usage_cost(model, counts["prompt_tokens"], counts["completion_tokens"], counts["cached_tokens"])
+    totals = LLM_USAGE[model]
+    totals["requests"] += 1
+    for key, value in counts.items():
+        totals[key] += value
+    totals["cost_usd"] += cost
+    LLM_TOKENS.labels(model=model, kind="prompt").inc(counts["prompt_tokens"] - counts["cached_tokens"])
+    LLM_TOKENS.labels(model=model, kind="cached").inc(counts["cached_tokens"])
+    LLM_TOKENS.labels(model=model, kind="completion").inc(counts["completion_tokens"])
+    LLM_COST_USD.labels(model=model).inc(cost)
+    set_attributes(**counts, cost_usd=cost)
+    logger.info(
+        f"LLM usage {model}: prompt={counts['prompt_tokens']} "
+        f"cached={counts['cached_tokens']} completion={counts['completion_tokens']} cost=${cost:.5f}"
+    )
+    return counts
+
+
+def complete(client, **kwargs):
+    """
+    Non-streaming chat completion, timed and with its usage recorded.
+    Returns the provider response (OpenAI shape).
+    """
+    model = kwargs.get("model", "")
+    with span("llm.complete", model=model):
+        start = time.perf_counter()
+        response = client.chat.completions.create(**kwargs)
+        LLM_REQUEST_SECONDS.labels(model=model).observe(time.perf_counter() - start)
+        usage = getattr(response, "usage", None)
+        if usage:
+            record_usage(model, usage)
+    return response
+
+
+def stream_completion_text(client, cache_prefix: bool = False, **kwargs) -> Iterator[str]:
+    """
+    Stream a chat completion and yield its text deltas as they arrive.
+    Works with both the OpenAI client and the Anthropic adapter.
+
+    cache_prefix marks the system message as a cacheable prompt prefix:
+    explicit cache_control through the Anthropic adapter, automatic prefix
+    caching on OpenAI-compatible providers (put the stable part first).
+    Token usage, including cached tokens, is recorded with record_usage().
+    """
+    if isinstance(client, _AnthropicAdapter):
+        kwargs["cache_system"] = cache_prefix
+    elif settings.LLM_STREAM_USAGE:
+        kwargs.setdefault("stream_options", {"include_usage": True})
+
+    model = kwargs.get("model", "")
+    start = time.perf_counter()
+    with span("llm.stream", model=model):
+        try:
+            for chunk in client.chat.completions.create(stream=True, **kwargs):
+                usage = getattr(chunk, "usage", None)
+                if usage:
+                    record_usage(model, usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            LLM_REQUEST_SECONDS.labels(model=model).observe(time.perf_counter() - start)
+
+
 # ---------------------------------------------------------------------------
 # Anthropic adapter — exposes the same interface as the OpenAI client
 # so all agents can call client.chat.completions.create() without changes
@@ -37,15 +161,49 @@ class _Choice:
 
 
 class _Response:
-    def __init__(self, content: str):
+    def __init__(self, content: str, usage: "_Usage | None" = None):
         self.choices = [_Choice(content)]
+        self.usage = usage
+
+
+class _Delta:
+    def __init__(self, content: str | None):
+        self.content = content
+
+
+class _StreamChoice:
+    def __init__(self, content: str | None):
+        self.delta = _Delta(content)
+
+
+class _Usage:
+    def __init__(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached_tokens = cached_tokens
+
+
+class _StreamChunk:
+    def __init__(self, content: str | None, usage: _Usage | None = None):
+        self.choices = [_StreamChoice(content)] if content is not None else []
+        self.usage = usage
 
 
 class _Completions:
     def __init__(self, anthropic_client):
         self._client = anthropic_client
 
-    def create(self, model: str, messages: list, temperature: float = 1.0, **_) -> _Response:
+    def create(
+        self,
+        model: str,
+        messages: list,
+        temperature: float = 1.0,
+        stream: bool = False,
+        response_format: dict | None = None,
+        cache_system: bool = False,
+        max_tokens: int | None = None,
+        **_,
+    ):
         system_msg = None
         user_messages = []
         for m in messages:
@@ -56,15 +214,59 @@ class _Completions:
 
         create_kwargs = {
             "model": model,
-            "max_tokens": 4096,
+            "max_tokens": max_tokens or model_limits(model).max_output,
             "messages": user_messages,
             "temperature": min(float(temperature), 1.0),  # Anthropic caps at 1.0
         }
-        if system_msg:
+        if system_msg and cache_system:
+            create_kwargs["system"] = [
+                {"type": "text", "text": system_msg, "cache_control": {"type": "ephemeral"}}
+            ]
+        elif system_msg:
             create_kwargs["system"] = system_msg
 
+        # JSON schema → forced tool call; the tool input is the structured output
+        if response_format and response_format.get("type") == "json_schema":
+            spec = response_format["json_schema"]
+            create_kwargs["tools"] = [{
+                "name": spec["name"],
+                "description": "Return the result in this structure.",
+                "input_schema": spec["schema"],
+            }]
+            create_kwargs["tool_choice"] = {"type": "tool", "name": spec["name"]}
+
+        if stream:
+            return self._stream(create_kwargs)
         response = self._client.messages.create(**create_kwargs)
-        return _Response(response.content[0].text)
+        return _Response(self._content(response.content), usage=self._usage(response.usage))
+
+    @staticmethod
+    def _content(blocks) -> str:
+        for block in blocks:
+            if block.type == "tool_use":
+                return json.dumps(block.input)
+        return "".join(block.text for block in blocks if block.type == "text")
+
+    def _stream(self, create_kwargs: dict) -> Iterator[_StreamChunk]:
+        with self._client.messages.stream(**create_kwargs) as stream:
+            for event in stream:
+                if event.type != "content_block_delta":
+                    continue
+                if event.delta.type == "text_delta":
+                    yield _StreamChunk(event.delta.text)
+                elif event.delta.type == "input_json_delta":
+                    yield _StreamChunk(event.delta.partial_json)
+            yield _StreamChunk(None, usage=self._usage(stream.get_final_message().usage))
+
+    @staticmethod
+    def _usage(usage) -> _Usage:
+        cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        return _Usage(
+            prompt_tokens=usage.input_tokens + cache_read + cache_write,
+            completion_tokens=usage.output_tokens,
+            cached_tokens=cache_read,
+        )
 
 
 class _Chat:
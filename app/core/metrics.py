@@ -0,0 +1,87 @@
+"""
+Prometheus metrics for the API and the Celery workers.
+
+Both run several processes (Uvicorn workers, Celery prefork children), so
+set PROMETHEUS_MULTIPROC_DIR to an empty, writable directory shared by the
+processes of one service before starting it; /metrics and the worker
+exporter then aggregate every process. Without it, each process reports
+only its own metrics.
+"""
+import logging
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess, start_http_server
+
+logger = logging.getLogger(__name__)
+
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+_RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+# ------------------------------------------------------------------ API
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "API request latency", ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# ------------------------------------------------------------------ search
+SOURCE_REQUEST_SECONDS = Histogram(
+    "search_source_request_seconds", "Latency of one request to a job source", ["source", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+SOURCE_RESULTS = Histogram(
+    "search_source_results", "Jobs returned by a source for one search", ["source"],
+    buckets=(0, 1, 5, 10, 25, 50, 100, 200, 500),
+)
+DEDUP_RATIO = Histogram("search_dedup_ratio", "Jobs kept after deduplication / jobs fetched", buckets=_RATIO_BUCKETS)
+PREFILTER_RATIO = Histogram("search_prefilter_ratio", "Jobs kept by the pre-filter / deduplicated jobs", buckets=_RATIO_BUCKETS)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups", ["cache", "result"])
+
+# ------------------------------------------------------------------ LLM
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds", "LLM completion latency (whole stream when streaming)", ["model"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens", ["model", "kind"])  # kind: prompt|cached|completion
+LLM_COST_USD = Counter("llm_cost_usd_total", "Estimated LLM spend in USD", ["model"])
+
+# ------------------------------------------------------------------ refresh
+REFRESH_SECONDS = Histogram(
+    "job_refresh_seconds", "Duration of one user's job refresh", buckets=(5, 10, 20, 30, 60, 120, 300, 600, 1200),
+)
+REFRESH_NEW_JOBS = Histogram(
+    "job_refresh_new_jobs", "Jobs saved by one user's refresh", buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+
+
+def registry() -> CollectorRegistry:
+    """The registry to expose: all processes in multiprocess mode, this one otherwise."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        collected = CollectorRegistry()
+        multiprocess.MultiProcessCollector(collected)
+        return collected
+    return REGISTRY
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(port: int) -> bool:
+    """Serve /metrics for a Celery worker (called once, in the parent process)."""
+    try:
+        start_http_server(port, registry=registry())
+    except OSError as e:
+        logger.error(
+            f"Worker metrics exporter could not listen on :{port} ({e}); this worker's metrics "
+            f"are not exported. Give each worker on a host its own METRICS_WORKER_PORT."
+        )
+        return False
+    logger.info(f"Worker metrics exporter listening on :{port}")
+    return True
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a finished process's live gauges from the multiprocess directory."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
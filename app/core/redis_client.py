@@ -0,0 +1,21 @@
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=2)
+def get_redis(decode_responses: bool = True) -> redis.Redis:
+    """
+    Process-wide Redis client (one connection pool per decode mode).
+    Use decode_responses=False for binary payloads such as compressed blobs.
+    """
+    return redis.from_url(settings.REDIS_URL, decode_responses=decode_responses)
+
+
+@lru_cache(maxsize=2)
+def get_async_redis(decode_responses: bool = True) -> redis.asyncio.Redis:
+    """Async client for code running on an event loop: API, search agent (one pool per decode mode)."""
+    return redis.asyncio.from_url(settings.REDIS_URL, decode_responses=decode_responses)
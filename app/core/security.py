@@ -2,7 +2,9 @@
 Security utilities: safe password hashing + JWT.
 """
 
+import asyncio
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
@@ -13,25 +15,60 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
-# Use argon2
+# Use argon2; hashes made with other parameters are flagged for rehash (verify_and_update_password)
 pwd_context = CryptContext(
     schemes=["argon2"],
-    deprecated="auto"
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
 )
 
+
+class PasswordHashingBusy(Exception):
+    """Every hashing slot stayed taken for PASSWORD_HASH_QUEUE_TIMEOUT; retry shortly."""
+
+
+# argon2-cffi releases the GIL, so a thread pool hashes on several cores.
+# Callers await it from the event loop, holding no request thread meanwhile;
+# beyond workers + queue they wait at most PASSWORD_HASH_QUEUE_TIMEOUT, then
+# get PasswordHashingBusy instead of piling up.
+_hash_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="argon2")
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE)
+
+
+async def _run_in_hash_pool(fn, *args):
+    try:
+        await asyncio.wait_for(_hash_slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PasswordHashingBusy() from None
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+    finally:
+        _hash_slots.release()
+
+
 # ------------------ PASSWORD ------------------ #
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
     Hash a password safely using argon2
     """
-    return pwd_context.hash(password)
+    return await _run_in_hash_pool(pwd_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password safely.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _run_in_hash_pool(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password; on success also returns a new hash if the stored one
+    uses outdated argon2 parameters (None otherwise).
+    """
+    return await _run_in_hash_pool(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 # ------------------ JWT ------------------ #
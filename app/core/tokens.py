@@ -0,0 +1,120 @@
+"""
+Local token counting, per-model limits and prices.
+
+Counts use tiktoken when it is installed (exact for OpenAI models, a close
+estimate for others) and fall back to ~4 characters per token.
+"""
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    context: int
+    max_output: int
+
+
+# Prefix-matched; LLM_MODEL_LIMITS overrides or extends these
+DEFAULT_MODEL_LIMITS: dict[str, ModelLimits] = {
+    "gpt-4o": ModelLimits(context=128_000, max_output=16_384),
+    "gpt-4.1": ModelLimits(context=1_000_000, max_output=32_768),
+    "deepseek-chat": ModelLimits(context=64_000, max_output=8_192),
+    "claude": ModelLimits(context=200_000, max_output=8_192),
+    "llama": ModelLimits(context=128_000, max_output=8_192),
+    "mistral": ModelLimits(context=32_000, max_output=8_192),
+}
+FALLBACK_LIMITS = ModelLimits(context=32_000, max_output=4_096)
+
+
+@dataclass(frozen=True)
+class ModelPrices:
+    """USD per million tokens."""
+    input: float
+    output: float
+    cached_input: float
+
+
+# Prefix-matched; LLM_MODEL_PRICES overrides or extends these. Unknown models cost 0.
+DEFAULT_MODEL_PRICES: dict[str, ModelPrices] = {
+    "gpt-4o-mini": ModelPrices(input=0.15, output=0.60, cached_input=0.075),
+    "gpt-4o": ModelPrices(input=2.50, output=10.00, cached_input=1.25),
+    "gpt-4.1-mini": ModelPrices(input=0.40, output=1.60, cached_input=0.10),
+    "gpt-4.1": ModelPrices(input=2.00, output=8.00, cached_input=0.50),
+    "deepseek-chat": ModelPrices(input=0.27, output=1.10, cached_input=0.07),
+    "claude-3-5-haiku": ModelPrices(input=0.80, output=4.00, cached_input=0.08),
+    "claude-sonnet": ModelPrices(input=3.00, output=15.00, cached_input=0.30),
+}
+FREE = ModelPrices(input=0.0, output=0.0, cached_input=0.0)
+
+
+def _lookup(model: str, configured: dict, defaults: dict, fallback):
+    for table in (configured, defaults):
+        # Longest prefix wins ("gpt-4o-mini" before "gpt-4o")
+        for name in sorted(table, key=len, reverse=True):
+            if model.startswith(name):
+                return table[name]
+    return fallback
+
+
+@lru_cache(maxsize=None)
+def model_limits(model: str) -> ModelLimits:
+    configured = {
+        name: ModelLimits(**limits) for name, limits in json.loads(settings.LLM_MODEL_LIMITS or "{}").items()
+    }
+    return _lookup(model, configured, DEFAULT_MODEL_LIMITS, FALLBACK_LIMITS)
+
+
+@lru_cache(maxsize=None)
+def model_prices(model: str) -> ModelPrices:
+    configured = {
+        name: ModelPrices(**prices) for name, prices in json.loads(settings.LLM_MODEL_PRICES or "{}").items()
+    }
+    return _lookup(model, configured, DEFAULT_MODEL_PRICES, FREE)
+
+
+def usage_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """Estimated USD cost of one request; cached prompt tokens are billed at the cached rate."""
+    prices = model_prices(model)
+    return (
+        (prompt_tokens - cached_tokens) * prices.input
+        + cached_tokens * prices.cached_input
+        + completion_tokens * prices.output
+    ) / 1_000_000
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        import tiktoken  # type: ignore[import]
+    except ImportError:
+        logger.info("tiktoken not installed, estimating tokens from text length")
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str) -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    if not text:
+        return text
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[: max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
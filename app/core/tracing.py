@@ -0,0 +1,84 @@
+"""
+Tracing of job refreshes (OpenTelemetry).
+
+Spans are always created through the OpenTelemetry API, which is a no-op
+until configure_tracing() installs an SDK provider, per TRACING_EXPORTER:
+
+  none → no tracing (default)
+  otlp → OTLP/HTTP, endpoint and headers from the standard OTEL_EXPORTER_OTLP_* variables
+  file → one JSON span per line appended to TRACING_FILE, for when no collector runs
+
+Spans of one refresh share a trace id, so a slow refresh can be explained
+from its trace alone: grep the file for the user id, then for the trace id.
+"""
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+from opentelemetry import trace
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_tracer = trace.get_tracer("app")
+_provider = None
+
+
+def configure_tracing() -> None:
+    """Install the exporter; call once per process, after any fork (exporter threads don't survive it)."""
+    global _provider
+    exporter_name = settings.TRACING_EXPORTER
+    if exporter_name == "none" or _provider is not None:
+        return
+
+    # SDK and exporters only imported when tracing is on
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    elif exporter_name == "file":
+        exporter = ConsoleSpanExporter(
+            out=open(settings.TRACING_FILE, "a", encoding="utf-8"),
+            formatter=lambda finished: finished.to_json(indent=None) + "\n",
+        )
+    else:
+        logger.warning(f"Unknown TRACING_EXPORTER {exporter_name!r}, tracing disabled")
+        return
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info(f"Tracing enabled ({exporter_name})")
+
+
+def shutdown_tracing() -> None:
+    """Flush the spans still buffered by the batch processor."""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[trace.Span]:
+    """
+    Child span of the current one. Attributes set to None are skipped;
+    exceptions are recorded on the span and re-raised.
+    """
+    with _tracer.start_as_current_span(name) as current:
+        set_attributes(current, **attributes)
+        yield current
+
+
+def set_attributes(target: trace.Span | None = None, **attributes) -> None:
+    """Set attributes (e.g. counts known only at the end) on `target` or the current span."""
+    target = target or trace.get_current_span()
+    if not target.is_recording():
+        return
+    for key, value in attributes.items():
+        if value is not None:
+            target.set_attribute(key, value if isinstance(value, (bool, int, float, str)) else str(value))
@@ -0,0 +1,25 @@
+"""
+Create the database tables, outside the app's startup:
+
+    python -m app.db.init_db
+
+Run it once per deployment (or after adding a model) before starting the
+API and the workers. It only creates missing tables; changes to existing
+ones are migrations (python -m app.db.migrate).
+"""
+import logging
+
+from app.db.base import Base
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+def init_db() -> None:
+    Base.metadata.create_all(bind=engine)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    logger.info(f"Tables ready: {', '.join(sorted(Base.metadata.tables))}")
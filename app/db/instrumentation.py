@@ -0,0 +1,88 @@
+"""
+Query instrumentation through SQLAlchemy cursor events.
+
+- slow-query log: statements slower than DB_SLOW_QUERY_MS are logged with their duration
+- per-unit stats: inside track_queries() (one HTTP request, one Celery task) every
+  statement is counted and timed; a statement repeated DB_N_PLUS_ONE_THRESHOLD
+  times or more is reported as a likely N+1
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.queries")
+
+# Per-unit totals by name (route or task), same idea as LLM_USAGE
+DB_QUERY_TOTALS: dict[str, dict[str, float]] = defaultdict(
+    lambda: {"units": 0, "queries": 0, "time_ms": 0.0, "slow": 0}
+)
+
+
+@dataclass
+class QueryStats:
+    name: str
+    count: int = 0
+    time_ms: float = 0.0
+    slow: int = 0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("db_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    slow = elapsed_ms >= settings.DB_SLOW_QUERY_MS
+    if slow:
+        logger.warning(f"Slow query ({elapsed_ms:.0f} ms): {' '.join(statement.split())[:500]}")
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.time_ms += elapsed_ms
+        stats.slow += slow
+        stats.statements[statement] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the hooks to a sync engine (pass async_engine.sync_engine for async ones)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries(name: str) -> Iterator[QueryStats]:
+    """
+    Count and time every statement run in this context (threads started by
+    Starlette's threadpool inherit it). Logs a summary and any N+1 pattern on
+    exit, under stats.name (the caller may rename it before exiting).
+    """
+    stats = QueryStats(name)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        totals = DB_QUERY_TOTALS[stats.name]
+        totals["units"] += 1
+        totals["queries"] += stats.count
+        totals["time_ms"] += stats.time_ms
+        totals["slow"] += stats.slow
+        for sql, n in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+            logger.warning(f"Possible N+1 in {stats.name}: statement ran {n} times: {' '.join(sql.split())[:300]}")
+        logger.debug(f"{stats.name}: {stats.count} queries in {stats.time_ms:.1f} ms")
@@ -0,0 +1,97 @@
+"""
+Schema changes to existing tables, which init_db (create_all) never alters:
+
+    python -m app.db.migrate
+
+Run it after init_db and before deploying code that relies on the change.
+Applied versions are recorded in schema_migrations; every migration is also
+idempotent, so running it on a database created by the current init_db
+(which already has the change) is a no-op.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String, primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def refresh_token_device_unique(conn: Connection) -> None:
+    """
+    One refresh_tokens row per (user_id, device_id), which the login/rotation
+    upsert's ON CONFLICT needs, plus the expires_at index used by cleanup.
+    Older code could store several rows per device: the most recent live one
+    is kept, the others are deleted (those old sessions must log in again).
+    """
+    table = inspect(conn)
+    uniques = {c["name"] for c in table.get_unique_constraints("refresh_tokens")}
+    indexes = {i["name"] for i in table.get_indexes("refresh_tokens")}
+
+    if "uq_refresh_token_user_device" not in uniques | indexes:
+        deleted = conn.execute(text("""
+            DELETE FROM refresh_tokens WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id, device_id
+                        ORDER BY revoked ASC, created_at DESC
+                    ) AS position
+                    FROM refresh_tokens
+                ) ranked
+                WHERE position > 1
+            )
+        """)).rowcount
+        logger.info(f"refresh_tokens: removed {deleted} duplicate device rows")
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(
+                "ALTER TABLE refresh_tokens "
+                "ADD CONSTRAINT uq_refresh_token_user_device UNIQUE (user_id, device_id)"
+            ))
+        else:
+            # SQLite can't add constraints to a table; a unique index serves ON CONFLICT too
+            conn.execute(text(
+                "CREATE UNIQUE INDEX uq_refresh_token_user_device ON refresh_tokens (user_id, device_id)"
+            ))
+
+    if "ix_refresh_tokens_expires_at" not in indexes:
+        conn.execute(text("CREATE INDEX ix_refresh_tokens_expires_at ON refresh_tokens (expires_at)"))
+
+
+# In order; never rename or remove an entry once released
+MIGRATIONS = [
+    ("0001_refresh_token_device_unique", refresh_token_device_unique),
+]
+
+
+def migrate() -> list[str]:
+    """Apply the pending migrations, each in its own transaction. Returns their versions."""
+    _metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        applied = set(conn.scalars(select(schema_migrations.c.version)))
+
+    done = []
+    for version, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            migration(conn)
+            conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+        logger.info(f"Applied migration {version}")
+        done.append(version)
+    return done
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    applied = migrate()
+    logger.info(f"Migrations applied: {', '.join(applied) or 'none pending'}")
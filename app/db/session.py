@@ -1,17 +1,54 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine_kwargs = {}
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True, **engine_kwargs)
+def _async_database_url(url: str) -> str:
+    """Same database through an async driver: asyncpg for Postgres, aiosqlite for SQLite."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite:///"):
+        return "sqlite+aiosqlite:///" + url[len("sqlite:///"):]
+    return url
+
+
+def _engine_kwargs(url: str) -> dict:
+    # SQLite has no server-side pool to tune
+    if url.startswith("sqlite+aiosqlite"):
+        return {}
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, echo=settings.DB_ECHO, **_engine_kwargs(SQLALCHEMY_DATABASE_URL)
+)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_SQLALCHEMY_DATABASE_URL = _async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, echo=settings.DB_ECHO, **_engine_kwargs(ASYNC_SQLALCHEMY_DATABASE_URL)
+)
+instrument_engine(async_engine.sync_engine)
+# expire_on_commit=False: returned ORM objects stay readable after the session closes
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependency pour FastAPI
@@ -21,3 +58,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async dependency for the hot read endpoints: no threadpool slot per request
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
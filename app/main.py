@@ -1,7 +1,12 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from app.api.v1.router import api_router
 from app.api.v1 import jobs, applications, profile
-from app.db.session import engine, Base
+from app.core.metrics import HTTP_REQUEST_SECONDS, render_latest
+from app.core.security import PasswordHashingBusy
+from app.db.instrumentation import track_queries
+from app.db.session import async_engine
 from dotenv import load_dotenv
 from app.core.config import settings
 from logging_config import LogLevels, configure_logging
@@ -9,8 +14,7 @@ from logging_config import LogLevels, configure_logging
 # Load environment variables
 load_dotenv()
 
-# Create all tables (for dev)
-Base.metadata.create_all(bind=engine)
+# Tables are created by `python -m app.db.init_db`, not at import time
 
 configure_logging(LogLevels.info)
 
@@ -25,6 +29,50 @@ app.include_router(applications.router, prefix="/api/v1")
 app.include_router(profile.router, prefix="/api/v1")
 
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many concurrent password operations, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.middleware("http")
+async def request_metrics_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    status = "500"  # unless call_next returns: an unhandled error becomes a 500
+    try:
+        with track_queries(request.url.path) as stats:
+            try:
+                response = await call_next(request)
+                status = str(response.status_code)
+            finally:
+                route = request.scope.get("route")
+                # Route template, so /jobs/{job_id} is one entry and not one per id
+                route_path = getattr(route, "path", "unmatched")
+                stats.name = f"{request.method} {route_path}"
+    finally:
+        HTTP_REQUEST_SECONDS.labels(
+            method=request.method, route=route_path, status=status
+        ).observe(time.perf_counter() - start)
+    if settings.DEBUG:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Query-Time-Ms"] = f"{stats.time_ms:.1f}"
+    return response
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/")
 def health_check():
     return {"message": f"{settings.APP_NAME} operational!"}
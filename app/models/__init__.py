@@ -6,6 +6,7 @@ from app.models.cv import CV
 from app.models.job import Job
 from app.models.application import Application
 from app.models.user_job_profile import UserJobProfile
+from app.models.scoring_sample import ScoringSample
 
 __all__ = [
     "User",
@@ -14,4 +15,5 @@ __all__ = [
     "Job",
     "Application",
     "UserJobProfile",
+    "ScoringSample",
 ]
\ No newline at end of file
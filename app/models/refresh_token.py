@@ -1,6 +1,6 @@
 # app/models/refresh_token.py
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -14,10 +14,15 @@ class RefreshToken(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id",  ondelete="CASCADE"), nullable=False)
     token_hash = Column(String, unique=True, index=True, nullable=False)
-    device_id  = Column(String, nullable=False, index=True)
+    device_id  = Column(String, nullable=False)
     device_name = Column(String, nullable=True)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     revoked = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_used_at = Column(DateTime, default=datetime.utcnow)
-    user = relationship("User", back_populates="refresh_tokens")
\ No newline at end of file
+    user = relationship("User", back_populates="refresh_tokens")
+
+    __table_args__ = (
+        # One row per device: rotation is an upsert on this key
+        UniqueConstraint("user_id", "device_id", name="uq_refresh_token_user_device"),
+    )
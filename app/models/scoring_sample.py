@@ -0,0 +1,19 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, Float, DateTime, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.session import Base
+
+
+class ScoringSample(Base):
+    """
+    One LLM-scored job, kept whatever its score (unlike jobs, which only
+    holds those above JOB_SAVE_MIN_SCORE): the local re-ranker's training set.
+    """
+    __tablename__ = "scoring_samples"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    features = Column(JSON, nullable=False)  # FEATURE_NAMES → value, as seen at scoring time
+    llm_score = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -29,3 +29,15 @@ class CVParseResponse(BaseModel):
     is_cv: bool
     data: Optional[CVSchema] = None
     error: Optional[str] = None
+
+
+class CVUploadAccepted(BaseModel):
+    job_id: str
+    status: str
+
+
+class CVUploadStatus(BaseModel):
+    job_id: str
+    status: str  # PENDING | STARTED | SUCCESS | FAILURE
+    result: Optional[CVParseResponse] = None
+    error: Optional[str] = None
@@ -3,26 +3,30 @@ import urllib
 import uuid
 from datetime import datetime, timedelta
 
+import anyio
 import requests
 from fastapi import HTTPException, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from google.auth.transport import requests as google_requests
 from google.oauth2 import id_token
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.auth import AuthUser, ainvalidate_auth_cache
 from app.core.config import settings
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     get_password_hash,
     verify_access_token,
+    verify_and_update_password,
     verify_password,
 )
 from app.models.user import User
 from app.schemas.user import ChangePasswordSchema, ForgotPasswordSchema, ResetPasswordSchema
-from app.services.email_service import send_email
+from app.services.email_service import queue_email
 from app.services.token_service import (
-    cleanup_expired_tokens,
     get_user_active_sessions,
     get_valid_refresh_token,
     revoke_all_user_tokens,
@@ -30,20 +34,28 @@ from app.services.token_service import (
     store_refresh_token,
 )
 
-def login_user(
+async def login_user(
     form_data: OAuth2PasswordRequestForm,
     device_id: str | None,
     device_name: str | None,
-    db: Session,
+    db: AsyncSession,
     response: Response,
 ) -> dict:
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = (await db.scalars(select(User).where(User.email == form_data.username))).first()
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect username or password")
+    valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account not activated")
 
+    if new_hash:
+        # Stored hash predates the current argon2 parameters
+        user.hashed_password = new_hash
+        await db.commit()
+
     if not device_id:
         device_id = str(uuid.uuid4())
 
@@ -53,8 +65,8 @@ def login_user(
     )
     refresh_token, expires = create_refresh_token({"sub": str(user.id)})
 
-    store_refresh_token(
-        db=db,
+    await db.run_sync(
+        store_refresh_token,
         user_id=user.id,
         token=refresh_token,
         expires_at=expires,
@@ -66,8 +78,6 @@ def login_user(
     response.set_cookie("refresh_token", refresh_token, httponly=True, secure=True, samesite="lax", max_age=max_age)
     response.set_cookie("device_id", device_id, httponly=True, secure=True, samesite="lax", max_age=365 * 24 * 3600)
 
-    cleanup_expired_tokens(db)
-
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -122,7 +132,8 @@ def handle_google_callback(
 
     if not user:
         random_pw = secrets.token_urlsafe(32)
-        hashed_pw = get_password_hash(random_pw)
+        # Sync endpoint (threadpool): hand the hash to the event loop's hashing pool
+        hashed_pw = anyio.from_thread.run(get_password_hash, random_pw)
         user = User(
             id=uuid.uuid4(),
             email=email,
@@ -180,7 +191,7 @@ def request_password_reset(payload: ForgotPasswordSchema, db: Session) -> dict:
     db.commit()
 
     reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
-    send_email(
+    queue_email(
         to=user.email,
         subject="Reset your password",
         body=f"Click here to reset your password: {reset_link}"
@@ -189,31 +200,34 @@ def request_password_reset(payload: ForgotPasswordSchema, db: Session) -> dict:
     return {"msg": "If an account exists, a reset email has been sent"}
 
 
-def reset_password_with_token(payload: ResetPasswordSchema, db: Session) -> dict:
-    user = db.query(User).filter(User.reset_token == payload.token).first()
+async def reset_password_with_token(payload: ResetPasswordSchema, db: AsyncSession) -> dict:
+    user = (await db.scalars(select(User).where(User.reset_token == payload.token))).first()
     if not user:
         raise HTTPException(status_code=400, detail="Invalid token")
 
     if datetime.utcnow() > user.reset_token_expires:
         raise HTTPException(status_code=400, detail="Token expired")
 
-    user.hashed_password = get_password_hash(payload.new_password)
+    user.hashed_password = await get_password_hash(payload.new_password)
     user.reset_token = None
     user.reset_token_expires = None
 
-    db.add(user)
-    db.commit()
+    await db.commit()
+    await ainvalidate_auth_cache(user.id)
 
     return {"msg": "Password has been reset successfully"}
 
 
-def change_user_password(payload: ChangePasswordSchema, current_user: User, db: Session) -> dict:
-    if not verify_password(payload.old_password, current_user.hashed_password):
+async def change_user_password(payload: ChangePasswordSchema, current_user: AuthUser, db: AsyncSession) -> dict:
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    if not await verify_password(payload.old_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Old password is incorrect")
 
-    current_user.hashed_password = get_password_hash(payload.new_password)
-    db.commit()
-    db.refresh(current_user)
+    user.hashed_password = await get_password_hash(payload.new_password)
+    await db.commit()
+    await ainvalidate_auth_cache(user.id)
 
     return {"msg": "Password changed successfully"}
 
@@ -244,8 +258,7 @@ def rotate_refresh_token(
 
     user_id = payload["sub"]
 
-    revoke_refresh_token(db, refresh_token)
-
+    # The upsert below replaces this device's token, which revokes the old one
     new_access_token = create_access_token({"sub": str(user_id)})
     new_refresh_token, expires = create_refresh_token({"sub": str(user_id)})
 
@@ -271,13 +284,13 @@ def logout_device(refresh_token: str | None, db: Session, response: Response) ->
     return {"message": "Logged out"}
 
 
-def logout_all_devices(current_user: User, db: Session, response: Response) -> dict:
+def logout_all_devices(current_user: AuthUser, db: Session, response: Response) -> dict:
     revoke_all_user_tokens(db, current_user.id)
     response.delete_cookie("refresh_token")
     return {"message": "Logged out from all devices"}
 
 
-def list_user_sessions(current_user: User, db: Session) -> list:
+def list_user_sessions(current_user: AuthUser, db: Session) -> list:
     sessions = get_user_active_sessions(db, current_user.id)
     return [
         {
@@ -0,0 +1,65 @@
+"""
+Content-addressed cache for CV parsing.
+
+Two tiers, both in Redis (compressed):
+  cvcache:file:<sha256 of the uploaded bytes>     -> extracted text (skips OCR)
+  cvcache:text:<sha256 of the normalized text>    -> parsed CVParseResponse (skips the LLM)
+
+The text tier also catches files whose bytes differ but whose text is the
+same (re-exported PDF, new metadata). Parses are cached without the
+uploader's email, which is applied per user afterwards.
+"""
+import hashlib
+import logging
+import zlib
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.core.redis_client import get_redis
+from app.schemas.cv import CVParseResponse
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(raw_text: str) -> str:
+    normalized = " ".join(raw_text.split()).lower()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def _get(key: str) -> Optional[str]:
+    try:
+        blob = get_redis(decode_responses=False).get(key)
+        return zlib.decompress(blob).decode() if blob else None
+    except Exception as e:
+        logger.warning(f"CV cache read failed: {e!r}")
+        return None
+
+
+def _set(key: str, value: str) -> None:
+    try:
+        get_redis(decode_responses=False).set(
+            key, zlib.compress(value.encode()), ex=settings.CV_CACHE_TTL
+        )
+    except Exception as e:
+        logger.warning(f"CV cache write failed: {e!r}")
+
+
+def get_cached_text(file_hash: str) -> Optional[str]:
+    cached = _get(f"cvcache:file:{file_hash}")
+    CACHE_REQUESTS.labels(cache="cv_text", result="hit" if cached is not None else "miss").inc()
+    return cached
+
+
+def set_cached_text(file_hash: str, raw_text: str) -> None:
+    _set(f"cvcache:file:{file_hash}", raw_text)
+
+
+def get_cached_parse(raw_text: str) -> Optional[CVParseResponse]:
+    cached = _get(f"cvcache:text:{text_hash(raw_text)}")
+    CACHE_REQUESTS.labels(cache="cv_parse", result="hit" if cached else "miss").inc()
+    return CVParseResponse.model_validate_json(cached) if cached else None
+
+
+def set_cached_parse(raw_text: str, parsed: CVParseResponse) -> None:
+    _set(f"cvcache:text:{text_hash(raw_text)}", parsed.model_dump_json())
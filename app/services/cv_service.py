@@ -1,19 +1,33 @@
-import tempfile
+import asyncio
+import hashlib
+import logging
+import uuid
 from pathlib import Path
 from fastapi import UploadFile, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.redis_client import get_async_redis, get_redis
 from app.models.cv import CV
-from app.utils.ocr import extract_text_from_pdf, extract_text_from_image
-from app.ai_engine.parser.cv_ai_enricher import enrich_cv_with_llm
+from app.schemas.cv import CVParseResponse
+from app.services.cv_cache import get_cached_parse, get_cached_text, set_cached_parse, set_cached_text
+
+logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+CHUNK_SIZE = 1024 * 1024
+# Owner of each upload task, so its status is only shown to them; kept as
+# long as Celery keeps the task's result (result_expires, 1 day by default)
+UPLOAD_OWNER_PREFIX = "cv_upload:owner:"
+UPLOAD_OWNER_TTL = 24 * 3600
 
 
-async def process_uploaded_cv(file: UploadFile, user, db: Session):
+async def save_upload(file: UploadFile) -> tuple[Path, str]:
     """
-    Handle file validation, OCR, AI enrichment and DB storage.
+    Validate an uploaded CV and stream it to UPLOAD_DIR, which the CV
+    workers must be able to read (shared volume when they run elsewhere).
+    Returns the stored path and the SHA-256 of the content, computed while streaming.
     """
 
     if not file.filename:
@@ -26,54 +40,133 @@ async def process_uploaded_cv(file: UploadFile, user, db: Session):
             detail=f"Unsupported format. Use: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-    # Save temp file
-    with tempfile.NamedTemporaryFile(delete=True) as tmp:
-        total_size = 0
-        CHUNK_SIZE = 1024 * 1024
+    upload_dir = Path(settings.UPLOAD_DIR)
+    await asyncio.to_thread(upload_dir.mkdir, parents=True, exist_ok=True)
+    path = upload_dir / f"{uuid.uuid4()}{extension}"
+
+    total_size = 0
+    digest = hashlib.sha256()
+    # Disk I/O in threads: a slow (shared) upload volume must not block the event loop
+    out = await asyncio.to_thread(open, path, "wb")
+    try:
+        try:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                total_size += len(chunk)
+                if total_size > MAX_FILE_SIZE:
+                    raise HTTPException(status_code=400, detail="File too large")
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        finally:
+            await asyncio.to_thread(out.close)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return path, digest.hexdigest()
+
+
+async def process_uploaded_cv(file: UploadFile, user) -> dict:
+    """
+    Store the upload and queue OCR + AI enrichment on the CV workers.
+    Returns the job id to poll with get_cv_upload_status().
+    """
+    from app.tasks.cv_tasks import parse_cv_upload
+
+    path, file_hash = await save_upload(file)
+    # Owner recorded before the task exists, so it can be polled right away
+    job_id = str(uuid.uuid4())
+    await get_async_redis().set(f"{UPLOAD_OWNER_PREFIX}{job_id}", str(user.id), ex=UPLOAD_OWNER_TTL)
+    await asyncio.to_thread(
+        parse_cv_upload.apply_async, args=[str(user.id), str(path), file_hash], task_id=job_id
+    )
+    return {"job_id": job_id, "status": "PENDING"}
+
 
-        while True:
-            chunk = await file.read(CHUNK_SIZE)
-            if not chunk:
-                break
-            total_size += len(chunk)
-            if total_size > MAX_FILE_SIZE:
-                raise HTTPException(status_code=400, detail="File too large")
-            tmp.write(chunk)
+def get_cv_upload_status(job_id: str, user) -> dict:
+    from app.celery_app import celery
 
-        tmp.flush()
+    # Checked first: pending, running and failed uploads are private too,
+    # and an unknown id would otherwise just read as PENDING
+    if get_redis().get(f"{UPLOAD_OWNER_PREFIX}{job_id}") != str(user.id):
+        raise HTTPException(status_code=404, detail="Upload not found")
 
-        if extension == ".pdf":
-            raw_text = extract_text_from_pdf(tmp.name)
-        else:
-            raw_text = extract_text_from_image(tmp.name)
+    result = celery.AsyncResult(job_id)
+    status = {"job_id": job_id, "status": result.state}
 
-    # AI enrichment
-    cv = enrich_cv_with_llm(raw_text, email=user.email)
+    if result.state == "SUCCESS":
+        status["result"] = (result.result or {}).get("cv")
+    elif result.state == "FAILURE":
+        status["error"] = "CV processing failed"
+    return status
+
+
+def parse_cv_file(
+    file_path: str,
+    user_id: uuid.UUID,
+    email: str | None,
+    db: Session,
+    file_hash: str | None = None,
+) -> CVParseResponse:
+    """
+    Worker side of the upload: OCR, AI enrichment and DB storage.
+    Identical files skip OCR and identical texts skip the LLM.
+    """
+    # Worker-only dependencies (PIL, pdfplumber, LLM SDK): kept out of the API's startup
+    from app.utils.ocr import extract_text_from_pdf, extract_text_from_image
+    from app.ai_engine.parser.cv_ai_enricher import enrich_cv_with_llm
+
+    raw_text = get_cached_text(file_hash) if file_hash else None
+    if raw_text is None:
+        if Path(file_path).suffix.lower() == ".pdf":
+            raw_text = extract_text_from_pdf(file_path)
+        else:
+            raw_text = extract_text_from_image(file_path)
+        if file_hash:
+            set_cached_text(file_hash, raw_text)
+    else:
+        logger.info(f"CV text cache hit for {file_hash}")
+
+    cv = get_cached_parse(raw_text)
+    if cv is None:
+        # AI enrichment (cached without the uploader's email)
+        cv = enrich_cv_with_llm(raw_text)
+        if cv.is_cv:
+            set_cached_parse(raw_text, cv)
+    else:
+        logger.info("CV parse cache hit")
 
     if not cv.is_cv:
         return cv
 
-    # Compute next version
+    if email:
+        cv.data.email = email
+    _save_cv_version(db, user_id, cv.data.model_dump(), source="ai")
+    return cv
+
+
+def _save_cv_version(db: Session, user_id: uuid.UUID, data: dict, source: str) -> CV:
     last_cv = (
         db.query(CV)
-        .filter(CV.user_id == user.id)
+        .filter(CV.user_id == user_id)
         .order_by(CV.version.desc())
         .first()
     )
     next_version = (last_cv.version + 1) if last_cv else 1
 
     db_cv = CV(
-        user_id=user.id,
+        user_id=user_id,
         version=next_version,
-        source="ai",
-        data=cv.data.model_dump()
+        source=source,
+        data=data,
     )
 
     db.add(db_cv)
     db.commit()
     db.refresh(db_cv)
-
-    return cv
+    return db_cv
 
 
 def create_manual_cv(cv_schema, user, db: Session):
@@ -92,23 +185,6 @@ def create_manual_cv(cv_schema, user, db: Session):
     ]):
         raise HTTPException(status_code=400, detail="CV cannot be empty")
 
-    last_cv = (
-        db.query(CV)
-        .filter(CV.user_id == user.id)
-        .order_by(CV.version.desc())
-        .first()
-    )
-    next_version = (last_cv.version + 1) if last_cv else 1
-
-    db_cv = CV(
-        user_id=user.id,
-        version=next_version,
-        source="manual",
-        data=cv_schema.model_dump(),
-    )
-
-    db.add(db_cv)
-    db.commit()
-    db.refresh(db_cv)
+    _save_cv_version(db, user.id, cv_schema.model_dump(), source="manual")
 
     return cv_schema
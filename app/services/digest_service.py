@@ -0,0 +1,156 @@
+"""
+New-match digests.
+
+Each refresh records the ids of the jobs it saved in Redis; a periodic task
+drains them and sends one email per user per window, instead of users
+polling GET /jobs for news.
+"""
+import logging
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.models.job import Job
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PENDING_USERS_KEY = "digest:users"
+PENDING_JOBS_PREFIX = "digest:jobs:"
+# Claimed by a running send_pending_digests, deleted once the emails are queued
+PROCESSING_USERS_KEY = "digest:processing"
+PROCESSING_JOBS_PREFIX = "digest:processing:jobs:"
+SEND_LOCK_KEY = "digest:lock"
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "emails"
+
+
+def record_new_matches(user_id, job_ids: list[str]) -> None:
+    """Add a refresh's newly saved jobs to the user's pending digest."""
+    if not job_ids:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        pipe.sadd(f"{PENDING_JOBS_PREFIX}{user_id}", *job_ids)
+        pipe.sadd(PENDING_USERS_KEY, str(user_id))
+        pipe.execute()
+    except Exception as e:
+        # The jobs are saved either way; only the notification is lost
+        logger.warning(f"Could not record {len(job_ids)} new matches for digest of {user_id}: {e}")
+
+
+def _claim_pending(max_users: int) -> dict[str, list[str]]:
+    """
+    Move up to max_users pending digests to the processing keys, atomically,
+    and return them. They stay there until _release(): a crash or error in
+    between never loses a digest.
+    """
+    redis = get_redis()
+    user_ids = redis.srandmember(PENDING_USERS_KEY, max_users) or []
+    if not user_ids:
+        return {}
+    pipe = redis.pipeline()  # MULTI/EXEC
+    for user_id in user_ids:
+        processing = f"{PROCESSING_JOBS_PREFIX}{user_id}"
+        pipe.smove(PENDING_USERS_KEY, PROCESSING_USERS_KEY, user_id)
+        # Merged, not renamed: a leftover from an earlier failure is kept
+        pipe.sunionstore(processing, [processing, f"{PENDING_JOBS_PREFIX}{user_id}"])
+        pipe.delete(f"{PENDING_JOBS_PREFIX}{user_id}")
+        pipe.smembers(processing)
+    results = pipe.execute()
+    return {user_id: list(results[4 * i + 3]) for i, user_id in enumerate(user_ids)}
+
+
+def _release(user_ids, delivered: bool) -> None:
+    """Drop claimed digests once queued, or hand them back to the pending set."""
+    if not user_ids:
+        return
+    pipe = get_redis().pipeline()
+    for user_id in user_ids:
+        processing = f"{PROCESSING_JOBS_PREFIX}{user_id}"
+        if delivered:
+            pipe.srem(PROCESSING_USERS_KEY, user_id)
+        else:
+            pending = f"{PENDING_JOBS_PREFIX}{user_id}"
+            pipe.sunionstore(pending, [pending, processing])
+            pipe.smove(PROCESSING_USERS_KEY, PENDING_USERS_KEY, user_id)
+        pipe.delete(processing)
+    pipe.execute()
+
+
+@lru_cache(maxsize=1)
+def _templates():
+    """Compiled once per process; Jinja also caches the parsed templates."""
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    return env.get_template("job_digest.txt"), env.get_template("job_digest.html")
+
+
+def build_digests(db: Session, pending: dict[str, list[str]]) -> list[dict]:
+    """
+    One email message per user, best matches first. Jobs and users are
+    loaded in one query each for the whole batch.
+    """
+    all_job_ids = [uuid.UUID(job_id) for job_ids in pending.values() for job_id in job_ids]
+    jobs_by_user: dict[uuid.UUID, list[Job]] = {}
+    for job in db.query(Job).filter(Job.id.in_(all_job_ids)).order_by(Job.match_score.desc()):
+        jobs_by_user.setdefault(job.user_id, []).append(job)
+    if not jobs_by_user:
+        return []
+    users = db.query(User).filter(User.id.in_(list(jobs_by_user)), User.is_active == True).all()
+
+    text_template, html_template = _templates()
+    messages = []
+    for user in users:
+        jobs = jobs_by_user[user.id]
+        context = {
+            "name": user.full_name or user.email,
+            "jobs": jobs[:settings.DIGEST_MAX_JOBS],
+            "more": max(0, len(jobs) - settings.DIGEST_MAX_JOBS),
+            "frontend_url": settings.FRONTEND_URL,
+        }
+        messages.append({
+            "to": user.email,
+            "subject": f"{len(jobs)} new job match{'es' if len(jobs) > 1 else ''} for you",
+            "body": text_template.render(context),
+            "html": html_template.render(context),
+        })
+    return messages
+
+
+def send_pending_digests(db: Session) -> int:
+    """Send every pending digest, DIGEST_USERS_PER_BATCH users per email batch."""
+    from app.tasks.email_tasks import send_email_batch  # the task module imports this one
+
+    redis = get_redis()
+    # One run at a time, so a run never hands back digests another one is sending
+    if not redis.set(SEND_LOCK_KEY, "1", nx=True, ex=settings.DIGEST_INTERVAL_MINUTES * 60):
+        logger.info("Digests already being sent by another run, skipping")
+        return 0
+    try:
+        # Left over by a run that crashed before queueing them
+        _release(redis.smembers(PROCESSING_USERS_KEY), delivered=False)
+        sent = 0
+        while True:
+            pending = _claim_pending(settings.DIGEST_USERS_PER_BATCH)
+            if not pending:
+                return sent
+            try:
+                messages = build_digests(db, {user_id: ids for user_id, ids in pending.items() if ids})
+                if messages:
+                    send_email_batch.delay(messages)
+            except Exception:
+                _release(pending, delivered=False)
+                raise
+            _release(pending, delivered=True)
+            sent += len(messages)
+    finally:
+        redis.delete(SEND_LOCK_KEY)
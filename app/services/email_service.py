@@ -1,20 +1,114 @@
+import asyncio
+import logging
 import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings
 
-def send_email(to: str, subject: str, body: str):
-    """
-    Send a simple email.
-    """
-    msg = MIMEMultipart()
+logger = logging.getLogger(__name__)
+
+# One authenticated SMTP connection per process, reused across messages
+_smtp: smtplib.SMTP | None = None
+_smtp_lock = threading.Lock()
+
+
+def _build_message(to: str, subject: str, body: str, html: str | None = None) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative") if html else MIMEMultipart()
     msg['From'] = settings.SMTP_USERNAME
     msg['To'] = to
     msg['Subject'] = subject
     msg.attach(MIMEText(body, 'plain'))
+    if html:
+        msg.attach(MIMEText(html, 'html'))
+    return msg
+
+
+def _connect() -> smtplib.SMTP:
+    server = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+    server.starttls()
+    server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+    return server
+
+
+def _connection() -> smtplib.SMTP:
+    """The process's SMTP connection, reopened if the server dropped it."""
+    global _smtp
+    if _smtp is not None:
+        try:
+            if _smtp.noop()[0] == 250:
+                return _smtp
+        except smtplib.SMTPException:
+            pass
+        close_smtp_connection()
+    _smtp = _connect()
+    return _smtp
+
+
+def close_smtp_connection() -> None:
+    global _smtp
+    if _smtp is not None:
+        try:
+            _smtp.quit()
+        except Exception:
+            pass
+        _smtp = None
+
+
+def is_temporary_failure(exc: smtplib.SMTPException) -> bool:
+    """A 4xx reply (greylisting, full mailbox, rate limit...): the server asks to try again later."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    return isinstance(exc, smtplib.SMTPResponseException) and 400 <= exc.smtp_code < 500
+
+
+def send_emails(messages: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Send several messages ({"to", "subject", "body", "html"?}) over one
+    connection. Returns (refused, deferred): the messages the server
+    rejected for good (5xx) and those it asked to retry later (4xx);
+    connection errors are raised so the caller can retry.
+    """
+    refused, deferred = [], []
+    with _smtp_lock:
+        for message in messages:
+            msg = _build_message(message["to"], message["subject"], message["body"], message.get("html"))
+            try:
+                _connection().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Dropped between noop() and send: one reconnect, then let it raise
+                close_smtp_connection()
+                _connection().send_message(msg)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                if is_temporary_failure(e):
+                    logger.warning(f"Email to {message['to']} deferred: {e}")
+                    deferred.append(message)
+                else:
+                    logger.warning(f"Email to {message['to']} refused: {e}")
+                    refused.append(message)
+    return refused, deferred
+
+
+def send_email(to: str, subject: str, body: str):
+    """
+    Send a simple email, synchronously. Request handlers use queue_email.
+    """
+    send_emails([{"to": to, "subject": subject, "body": body}])
+
+
+def queue_email(to: str, subject: str, body: str) -> None:
+    """
+    Hand an email to the Celery email queue; the request does not wait on SMTP.
+    Called after the change it announces is committed, so a broker outage is
+    logged rather than failing the request.
+    """
+    from app.tasks.email_tasks import send_email_task
+    try:
+        send_email_task.delay(to, subject, body)
+    except Exception as e:
+        logger.error(f"Could not queue email '{subject}' to {to}: {e}")
+
 
-    # Connect to the SMTP server
-    with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-        server.starttls()
-        server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-        server.send_message(msg)
+async def aqueue_email(to: str, subject: str, body: str) -> None:
+    """queue_email for async code: publishing to the broker blocks."""
+    await asyncio.to_thread(queue_email, to, subject, body)
@@ -1,6 +1,8 @@
 import logging
 import httpx
 from app.core.config import settings
+from app.services.search.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.search.http import borrow_client, cached_get
 
 logger = logging.getLogger(__name__)
 
@@ -9,10 +11,14 @@ BASE_URL = "https://api.adzuna.com/v1/api/jobs/fr/search"
 
 class AdzunaService:
 
+    def __init__(self, http: httpx.AsyncClient | None = None):
+        self.http = http
+        self.breaker = CircuitBreaker("adzuna")
+
     async def search(self, keywords: str, location: str, pages: int = 3) -> list[dict]:
+        jobs = []
         try:
-            jobs = []
-            async with httpx.AsyncClient() as client:
+            async with borrow_client(self.http) as client:
                 for page in range(1, pages + 1):
                     params = {
                         "app_id": settings.ADZUNA_APP_ID,
@@ -22,11 +28,7 @@ class AdzunaService:
                         "results_per_page": 20,
                         "content-type": "application/json",
                     }
-                    resp = await client.get(
-                        f"{BASE_URL}/{page}",
-                        params=params,
-                        timeout=15,
-                    )
+                    resp = await cached_get(self.breaker, client, f"{BASE_URL}/{page}", params=params)
                     if resp.status_code != 200:
                         break
                     results = resp.json().get("results", [])
@@ -35,9 +37,12 @@ class AdzunaService:
                     jobs.extend([self._normalize(j) for j in results])
             logger.info(f"Adzuna: {len(jobs)} jobs found")
             return jobs
+        except CircuitOpenError:
+            logger.info(f"Adzuna skipped (circuit open), keeping {len(jobs)} jobs")
+            return jobs
         except Exception as e:
             logger.error(f"Adzuna search error: {e}")
-            return []
+            return jobs
 
     def _normalize(self, job: dict) -> dict:
         return {
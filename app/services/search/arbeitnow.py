@@ -1,5 +1,7 @@
 import logging
 import httpx
+from app.services.search.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.search.http import borrow_client, cached_get
 
 logger = logging.getLogger(__name__)
 
@@ -8,15 +10,18 @@ BASE_URL = "https://www.arbeitnow.com/api/job-board-api"
 
 class ArbeitnowService:
 
+    def __init__(self, http: httpx.AsyncClient | None = None):
+        self.http = http
+        self.breaker = CircuitBreaker("arbeitnow")
+
     async def search(self, keywords: str, pages: int = 3) -> list[dict]:
+        jobs = []
         try:
-            jobs = []
-            async with httpx.AsyncClient() as client:
+            async with borrow_client(self.http) as client:
                 for page in range(1, pages + 1):
-                    resp = await client.get(
-                        BASE_URL,
+                    resp = await cached_get(
+                        self.breaker, client, BASE_URL,
                         params={"q": keywords, "page": page},
-                        timeout=15,
                     )
                     if resp.status_code != 200:
                         break
@@ -26,9 +31,12 @@ class ArbeitnowService:
                     jobs.extend([self._normalize(j) for j in results])
             logger.info(f"Arbeitnow: {len(jobs)} jobs found")
             return jobs
+        except CircuitOpenError:
+            logger.info(f"Arbeitnow skipped (circuit open), keeping {len(jobs)} jobs")
+            return jobs
         except Exception as e:
             logger.error(f"Arbeitnow search error: {e}")
-            return []
+            return jobs
 
     def _normalize(self, job: dict) -> dict:
         return {
@@ -0,0 +1,158 @@
+"""
+Per-source circuit breaker with latency-adaptive timeouts.
+
+State lives in Redis so every worker sees the same picture of a provider:
+
+  cb:<name>:samples     recent outcomes, "<ok 0|1>:<latency ms>", newest first
+  cb:<name>:failures    consecutive failures
+  cb:<name>:open_until  epoch seconds; present while open or half-open
+  cb:<name>:probe       lock held by the single half-open probe
+
+The breaker runs on the search event loop, so it uses the async client and
+gives Redis at most CIRCUIT_REDIS_TIMEOUT per call. If Redis is slow or
+unreachable the breaker fails open (requests go through with the maximum
+timeout), which is the behaviour we had before it existed.
+"""
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.metrics import SOURCE_REQUEST_SECONDS
+from app.core.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose circuit is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit open for {name}")
+        self.name = name
+
+
+class CircuitBreaker:
+
+    SNAPSHOT_TTL = 2.0  # seconds a worker trusts its last Redis read
+
+    def __init__(
+        self,
+        name: str,
+        min_timeout: float | None = None,
+        max_timeout: float | None = None,
+    ):
+        self.name = name
+        self.min_timeout = min_timeout if min_timeout is not None else settings.SOURCE_TIMEOUT_MIN
+        self.max_timeout = max_timeout if max_timeout is not None else settings.SOURCE_TIMEOUT_MAX
+        self._prefix = f"cb:{name}"
+        self._snapshot: tuple[float, float, list[tuple[bool, float]]] | None = None
+
+    # ------------------------------------------------------------------ state
+
+    @staticmethod
+    async def _execute(pipe) -> list:
+        return await asyncio.wait_for(pipe.execute(), timeout=settings.CIRCUIT_REDIS_TIMEOUT)
+
+    async def _read(self) -> tuple[float, list[tuple[bool, float]]]:
+        now = time.monotonic()
+        if self._snapshot and now - self._snapshot[0] < self.SNAPSHOT_TTL:
+            return self._snapshot[1], self._snapshot[2]
+        pipe = get_async_redis().pipeline()
+        pipe.get(f"{self._prefix}:open_until")
+        pipe.lrange(f"{self._prefix}:samples", 0, settings.CIRCUIT_WINDOW - 1)
+        open_until, raw_samples = await self._execute(pipe)
+        samples = []
+        for raw in raw_samples:
+            ok, _, latency_ms = raw.partition(":")
+            samples.append((ok == "1", float(latency_ms) / 1000))
+        open_until = float(open_until) if open_until else 0.0
+        self._snapshot = (now, open_until, samples)
+        return open_until, samples
+
+    async def allow(self) -> bool:
+        """False while open; once the cooldown is over, lets a single probe through."""
+        try:
+            open_until, _ = await self._read()
+            if not open_until:
+                return True
+            if time.time() < open_until:
+                return False
+            acquired = await asyncio.wait_for(
+                get_async_redis().set(f"{self._prefix}:probe", "1", nx=True, ex=int(self.max_timeout) + 1),
+                timeout=settings.CIRCUIT_REDIS_TIMEOUT,
+            )
+            if acquired:
+                logger.info(f"Circuit {self.name}: half-open, probing")
+            return bool(acquired)
+        except Exception as e:
+            logger.debug(f"Circuit {self.name}: state unavailable ({e!r}), allowing")
+            return True
+
+    async def timeout(self) -> float:
+        """p95 of recent successful calls times a safety factor, within [min, max]."""
+        try:
+            _, samples = await self._read()
+        except Exception:
+            return self.max_timeout
+        latencies = sorted(latency for ok, latency in samples if ok)
+        if len(latencies) < settings.CIRCUIT_MIN_SAMPLES:
+            return self.max_timeout
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return max(self.min_timeout, min(self.max_timeout, p95 * settings.SOURCE_TIMEOUT_P95_FACTOR))
+
+    # -------------------------------------------------------------- recording
+
+    def _push_sample(self, pipe, ok: bool, latency: float) -> None:
+        key = f"{self._prefix}:samples"
+        pipe.lpush(key, f"{int(ok)}:{int(latency * 1000)}")
+        pipe.ltrim(key, 0, settings.CIRCUIT_WINDOW - 1)
+
+    async def record_success(self, latency: float) -> None:
+        SOURCE_REQUEST_SECONDS.labels(source=self.name, outcome="success").observe(latency)
+        try:
+            pipe = get_async_redis().pipeline()
+            pipe.delete(f"{self._prefix}:open_until")
+            pipe.delete(f"{self._prefix}:failures", f"{self._prefix}:probe")
+            was_open = (await self._execute(pipe))[0]
+            pipe = get_async_redis().pipeline()
+            if was_open:
+                # The probe succeeded and the circuit closes: start a fresh window, or
+                # the failures from before the outage would reopen it at the next error
+                pipe.delete(f"{self._prefix}:samples")
+                logger.info(f"Circuit {self.name}: closed")
+            self._push_sample(pipe, True, latency)
+            await self._execute(pipe)
+            self._snapshot = None
+        except Exception as e:
+            logger.debug(f"Circuit {self.name}: could not record success ({e!r})")
+
+    async def record_failure(self, latency: float) -> None:
+        SOURCE_REQUEST_SECONDS.labels(source=self.name, outcome="failure").observe(latency)
+        try:
+            pipe = get_async_redis().pipeline()
+            self._push_sample(pipe, False, latency)
+            pipe.incr(f"{self._prefix}:failures")
+            pipe.lrange(f"{self._prefix}:samples", 0, settings.CIRCUIT_WINDOW - 1)
+            results = await self._execute(pipe)
+            consecutive, samples = results[-2], results[-1]
+            self._snapshot = None
+
+            errors = sum(1 for raw in samples if raw.startswith("0:"))
+            error_rate = errors / len(samples) if samples else 0.0
+            if consecutive >= settings.CIRCUIT_FAILURE_THRESHOLD or (
+                len(samples) >= settings.CIRCUIT_MIN_SAMPLES and error_rate >= settings.CIRCUIT_ERROR_RATE
+            ):
+                await self._open(consecutive, error_rate)
+        except Exception as e:
+            logger.debug(f"Circuit {self.name}: could not record failure ({e!r})")
+
+    async def _open(self, consecutive: int, error_rate: float) -> None:
+        pipe = get_async_redis().pipeline()
+        pipe.set(f"{self._prefix}:open_until", time.time() + settings.CIRCUIT_COOLDOWN_SECONDS)
+        pipe.delete(f"{self._prefix}:probe")
+        await self._execute(pipe)
+        logger.warning(
+            f"Circuit {self.name}: opened for {settings.CIRCUIT_COOLDOWN_SECONDS}s "
+            f"({consecutive} consecutive failures, error rate {error_rate:.0%})"
+        )
@@ -1,8 +1,11 @@
 import logging
+import time
 import httpx
 from dotenv import load_dotenv
 load_dotenv()
 from app.core.config import settings
+from app.services.search.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.search.http import borrow_client, cached_get, guarded_request
 from app.services.search.keyword_translator import translate_for_france_travail
 
 logger = logging.getLogger(__name__)
@@ -13,11 +16,22 @@ SEARCH_URL = "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/se
 
 class FranceTravailService:
 
+    # Refresh the token this many seconds before it actually expires
+    TOKEN_EXPIRY_MARGIN = 60
+
+    def __init__(self, http: httpx.AsyncClient | None = None):
+        self.http = http
+        self.breaker = CircuitBreaker("france_travail")
+        self._token: str | None = None
+        self._token_expires_at = 0.0
+
     async def _get_token(self) -> str:
+        if self._token and time.monotonic() < self._token_expires_at:
+            return self._token
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.post(
-                    TOKEN_URL,
+            async with borrow_client(self.http) as client:
+                resp = await guarded_request(
+                    self.breaker, client, "POST", TOKEN_URL,
                     params={"realm": "/partenaire"},
                     data={
                         "grant_type": "client_credentials",
@@ -26,11 +40,17 @@ class FranceTravailService:
                         "scope": "api_offresdemploiv2 o2dsoffre",
                     },
                     headers={"Content-Type": "application/x-www-form-urlencoded"},
-                    timeout=10,
                 )
                 resp.raise_for_status()
-                logger.info(f"Successfully obtained FranceTravail access token {resp.json()['access_token']}")
-                return resp.json()["access_token"]
+                data = resp.json()
+                self._token = data["access_token"]
+                self._token_expires_at = (
+                    time.monotonic() + int(data.get("expires_in", 0)) - self.TOKEN_EXPIRY_MARGIN
+                )
+                logger.info("Successfully obtained FranceTravail access token")
+                return self._token
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"FranceTravail token error: {e!r}")
             raise
@@ -77,12 +97,12 @@ class FranceTravailService:
         return self.COMMUNE_CODES.get(location.lower().strip())
 
     async def search(self, keywords: str, location: str, pages: int = 3) -> list[dict]:
+        jobs = []
         try:
             token = await self._get_token()
             commune_code = self._resolve_commune(location)
             keywords = translate_for_france_travail(keywords)
-            jobs = []
-            async with httpx.AsyncClient() as client:
+            async with borrow_client(self.http) as client:
                 for page in range(pages):
                     params: dict = {
                         "motsCles": keywords,
@@ -90,11 +110,11 @@ class FranceTravailService:
                     }
                     if commune_code:
                         params["commune"] = commune_code
-                    resp = await client.get(
-                        SEARCH_URL,
+                    resp = await cached_get(
+                        self.breaker, client, SEARCH_URL,
                         params=params,
                         headers={"Authorization": f"Bearer {token}"},
-                        timeout=15,
+                        ok_statuses=(200, 206),
                     )
                     if resp.status_code not in (200, 206):
                         break
@@ -105,9 +125,12 @@ class FranceTravailService:
                     jobs.extend([self._normalize(j) for j in results])
             logger.info(f"FranceTravail: {len(jobs)} jobs found")
             return jobs
+        except CircuitOpenError:
+            logger.info(f"FranceTravail skipped (circuit open), keeping {len(jobs)} jobs")
+            return jobs
         except Exception as e:
             logger.error(f"FranceTravail search error: {e!r}")
-            return []
+            return jobs
 
     def _normalize(self, job: dict) -> dict:
 
@@ -0,0 +1,131 @@
+"""
+Shared HTTP plumbing for the job source clients.
+"""
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.core.tracing import set_attributes, span
+from app.services.search.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.search.response_cache import CacheEntry, cache_key, response_cache
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Pooled client shared by all sources of a SearchAgent.
+    Must be used from a single event loop for its whole lifetime.
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.SEARCH_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SEARCH_HTTP_MAX_KEEPALIVE,
+        ),
+        timeout=settings.SOURCE_TIMEOUT_MAX,
+    )
+
+
+@asynccontextmanager
+async def borrow_client(client: Optional[httpx.AsyncClient]) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Yield the shared client when there is one (left open for the next call),
+    otherwise a short-lived client closed on exit.
+    """
+    if client is not None:
+        yield client
+        return
+    async with httpx.AsyncClient() as own_client:
+        yield own_client
+
+
+async def guarded_request(
+    breaker: CircuitBreaker,
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Send a request through the source's circuit breaker: skipped while the
+    circuit is open, bounded by the breaker's adaptive timeout, and recorded
+    as a success or failure (transport errors, 429 and 5xx) afterwards.
+    """
+    if not await breaker.allow():
+        raise CircuitOpenError(breaker.name)
+    timeout = await breaker.timeout()
+    start = time.monotonic()
+    try:
+        resp = await client.request(method, url, timeout=timeout, **kwargs)
+    except Exception:
+        await breaker.record_failure(time.monotonic() - start)
+        raise
+    elapsed = time.monotonic() - start
+    if resp.status_code == 429 or resp.status_code >= 500:
+        await breaker.record_failure(elapsed)
+    else:
+        await breaker.record_success(elapsed)
+    return resp
+
+
+async def cached_get(
+    breaker: CircuitBreaker,
+    client: httpx.AsyncClient,
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    ok_statuses: tuple[int, ...] = (200,),
+    ttl: Optional[int] = None,
+) -> httpx.Response:
+    """
+    GET through the shared response cache, then the circuit breaker.
+    Fresh entries are served without leaving the cluster; stale ones are
+    revalidated with If-None-Match / If-Modified-Since when the source sent
+    validators. Headers (e.g. Authorization) are not part of the cache key.
+    One "search.page" span per call.
+    """
+    with span("search.page", source=breaker.name, url=url) as page_span:
+        resp = await _cached_get(breaker, client, url, params, headers, ok_statuses, ttl)
+        set_attributes(page_span, status_code=resp.status_code)
+        return resp
+
+
+async def _cached_get(
+    breaker: CircuitBreaker,
+    client: httpx.AsyncClient,
+    url: str,
+    params: Optional[dict],
+    headers: Optional[dict],
+    ok_statuses: tuple[int, ...],
+    ttl: Optional[int],
+) -> httpx.Response:
+    if not response_cache.enabled:
+        return await guarded_request(breaker, client, "GET", url, params=params, headers=headers)
+
+    ttl = ttl or settings.SEARCH_CACHE_TTL
+    key = cache_key(breaker.name, url, params)
+    entry = await response_cache.get(key)
+    request = httpx.Request("GET", url, params=params)
+    if entry and entry.is_fresh:
+        CACHE_REQUESTS.labels(cache="search_response", result="hit").inc()
+        set_attributes(cache="hit")
+        return entry.to_response(request)
+
+    request_headers = dict(headers or {})
+    if entry:
+        request_headers.update(entry.validators())
+    resp = await guarded_request(breaker, client, "GET", url, params=params, headers=request_headers)
+
+    if resp.status_code == 304 and entry:
+        CACHE_REQUESTS.labels(cache="search_response", result="revalidated").inc()
+        set_attributes(cache="revalidated")
+        entry.fresh_until = time.time() + ttl
+        await response_cache.set(key, entry)
+        return entry.to_response(request)
+    CACHE_REQUESTS.labels(cache="search_response", result="miss").inc()
+    set_attributes(cache="miss")
+    if resp.status_code in ok_statuses:
+        await response_cache.set(key, CacheEntry.from_response(resp, ttl))
+    return resp
@@ -1,47 +1,148 @@
+import asyncio
 import logging
-from typing import Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.core.config import settings
+from app.core.tracing import set_attributes, span
+from app.services.search.circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
 
+def _scrape_site(site: str, keywords: str, location: str, max_jobs: int) -> list[dict]:
+    """Runs in a pool thread: scrape one site and return plain dicts."""
+    from jobspy import scrape_jobs
+    df = scrape_jobs(
+        site_name=[site],
+        search_term=keywords,
+        location=location,
+        results_wanted=max_jobs,
+        country_indeed="France",
+    )
+    if df is None or df.empty:
+        return []
+    # NaN/NaT -> None for every column at once, then read rows as dicts.
+    df = df.astype(object).where(df.notna(), None)
+    return [JobSpyScraper._normalize(row, site) for row in df.to_dict("records")]
+
+
 class JobSpyScraper:
+    """
+    JobSpy scraping is blocking, so each site is scraped in a thread from a
+    bounded pool, away from the event loop. Threads rather than processes:
+    Celery prefork children are daemonic and may not start processes, and
+    the scrapes mostly wait on the network.
 
-    def scrape(self, keywords: str, location: str, max_jobs: int = 50) -> list[dict]:
+    A slot is held until its scrape really returns, even after the caller
+    gave up on it: a hung scrape keeps its thread, so the pool never queues
+    work behind it and the breakers only ever time the scrape itself.
+    """
+
+    def __init__(self, sites: list[str] | None = None, max_workers: int | None = None):
+        self.sites = sites or settings.JOBSPY_SITES
+        self.max_workers = max_workers or settings.JOBSPY_MAX_WORKERS
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+        self.breakers = {
+            site: CircuitBreaker(f"jobspy_{site}", max_timeout=settings.JOBSPY_SITE_TIMEOUT)
+            for site in self.sites
+        }
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="jobspy")
+        return self._pool
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Created in the running loop, and again for a new one (scrape() runs one per call)."""
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(self.max_workers), loop
+        return self._slots
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _scrape_site_async(self, site: str, keywords: str, location: str, max_jobs: int) -> list[dict]:
+        with span("search.jobspy_site", source=site) as site_span:
+            jobs = await self._scrape_site_guarded(site, keywords, location, max_jobs)
+            set_attributes(site_span, jobs=len(jobs))
+            return jobs
+
+    async def _scrape_site_guarded(self, site: str, keywords: str, location: str, max_jobs: int) -> list[dict]:
+        breaker = self.breakers[site]
+        if not await breaker.allow():
+            logger.info(f"JobSpy {site} skipped (circuit open)")
+            return []
+        timeout = await breaker.timeout()
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Not the site's fault: don't count it against its breaker
+            logger.warning(f"JobSpy {site} skipped: all {self.max_workers} scrape threads busy")
+            return []
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().run_in_executor(
+            self.pool, _scrape_site, site, keywords, location, max_jobs
+        )
+        future.add_done_callback(partial(self._release_slot, slots))
         try:
-            from jobspy import scrape_jobs
-            df = scrape_jobs(
-                site_name=["indeed", "glassdoor", "linkedin", "google"],
-                search_term=keywords,
-                location=location,
-                results_wanted=max_jobs,
-                country_indeed="France",
-            )
-            if df is None or df.empty:
-                return []
-            jobs = [self._normalize(row) for _, row in df.iterrows()]
-            logger.info(f"JobSpy: {len(jobs)} jobs found")
+            # shield: a timeout must not mark the future done while the thread still runs
+            jobs = await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+            await breaker.record_success(time.monotonic() - start)
+            logger.info(f"JobSpy {site}: {len(jobs)} jobs found")
             return jobs
+        except asyncio.TimeoutError:
+            await breaker.record_failure(time.monotonic() - start)
+            logger.warning(f"JobSpy {site} timed out after {timeout:.0f}s")
         except Exception as e:
-            logger.error(f"JobSpy scrape error: {e}")
-            return []
+            await breaker.record_failure(time.monotonic() - start)
+            logger.error(f"JobSpy {site} scrape error: {e}")
+        return []
+
+    @staticmethod
+    def _release_slot(slots: asyncio.Semaphore, future: asyncio.Future) -> None:
+        slots.release()
+        if not future.cancelled():
+            future.exception()  # retrieved, so a late failure isn't reported as unhandled
 
-    def _normalize(self, row: Any) -> dict:
-        def safe(val):
-            return None if (val is None or (hasattr(val, "__class__") and val.__class__.__name__ == "float" and str(val) == "nan")) else val
+    async def search(self, keywords: str, location: str, max_jobs: int = 50) -> list[dict]:
+        """All sites concurrently; a failing or slow site only loses its own jobs."""
+        results = await asyncio.gather(
+            *(self._scrape_site_async(site, keywords, location, max_jobs) for site in self.sites)
+        )
+        return [job for site_jobs in results for job in site_jobs]
+
+    def scrape(self, keywords: str, location: str, max_jobs: int = 50) -> list[dict]:
+        """Blocking variant for callers outside an event loop."""
+        return asyncio.run(self.search(keywords, location, max_jobs))
 
+    @staticmethod
+    def _normalize(row: dict, site: str) -> dict:
+        job_type = row.get("job_type")
+        min_amount = row.get("min_amount")
+        max_amount = row.get("max_amount")
         return {
-            "external_id": safe(row.get("id")),
-            "source": safe(row.get("site")) or "indeed",
-            "title": safe(row.get("title")),
-            "company": safe(row.get("company")),
-            "location": safe(row.get("location")),
-            "remote": "remote" if safe(row.get("is_remote")) else None,
-            "contract": str(safe(row.get("job_type"))) if safe(row.get("job_type")) else None,
-            "salary_min": int(row["min_amount"]) if safe(row.get("min_amount")) else None,
-            "salary_max": int(row["max_amount"]) if safe(row.get("max_amount")) else None,
-            "description": safe(row.get("description")),
+            "external_id": row.get("id"),
+            "source": row.get("site") or site,
+            "title": row.get("title"),
+            "company": row.get("company"),
+            "location": row.get("location"),
+            "remote": "remote" if row.get("is_remote") else None,
+            "contract": str(job_type) if job_type else None,
+            "salary_min": int(min_amount) if min_amount else None,
+            "salary_max": int(max_amount) if max_amount else None,
+            "description": row.get("description"),
             "skills_required": [],
-            "url": safe(row.get("job_url")),
+            "url": row.get("job_url"),
             "apply_type": "external",
-            "published_at": safe(row.get("date_posted")),
-        }
\ No newline at end of file
+            "published_at": row.get("date_posted"),
+        }
@@ -1,17 +1,13 @@
 import logging
-import redis
 from app.core.config import settings
-from app.core.llm import get_llm_client
+from app.core.llm import complete, get_llm_client
+from app.core.redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
 _TTL = 30 * 24 * 3600  # 30 days
 
 
-def _redis() -> redis.Redis:
-    return redis.from_url(settings.CELERY_BROKER_URL, decode_responses=True)
-
-
 def translate_for_france_travail(keyword: str) -> str:
     """
     Translate a job search keyword to French for the France Travail API.
@@ -26,7 +22,7 @@ def translate_for_france_travail(keyword: str) -> str:
 
     # 1. Redis cache lookup
     try:
-        cached = _redis().get(cache_key)
+        cached = get_redis().get(cache_key)
         if cached:
             logger.debug(f"Keyword translation cache hit: '{keyword}' → '{cached}'")
             return cached
@@ -36,7 +32,8 @@ def translate_for_france_travail(keyword: str) -> str:
     # 2. LLM translation
     try:
         client = get_llm_client()
-        resp = client.chat.completions.create(
+        resp = complete(
+            client,
             model=settings.LLM_MODEL_FAST,
             messages=[{
                 "role": "user",
@@ -56,7 +53,7 @@ def translate_for_france_travail(keyword: str) -> str:
 
         # 3. Store in Redis
         try:
-            _redis().set(cache_key, translated, ex=_TTL)
+            get_redis().set(cache_key, translated, ex=_TTL)
         except Exception as e:
             logger.warning(f"Failed to cache keyword translation: {e!r}")
 
@@ -1,16 +1,15 @@
-import json
 import logging
-import re
-from app.core.llm import get_llm_client
+from app.core.llm import complete, get_llm_client
 from app.core.config import settings
+from app.utils.json_stream import parse_llm_json
 
 logger = logging.getLogger(__name__)
 
 
 class JobNormalizer:
 
-    def __init__(self):
-        self.client = get_llm_client()
+    def __init__(self, client=None):
+        self.client = client or get_llm_client()
         self.model = settings.LLM_MODEL_FAST
 
     def enrich(self, job: dict) -> dict:
@@ -21,14 +20,13 @@ class JobNormalizer:
                     "Return ONLY a JSON object: {\"skills\": [\"skill1\", \"skill2\"]}\n\n"
                     f"Description: {job['description'][:800]}"
                 )
-                resp = self.client.chat.completions.create(
+                resp = complete(
+                    self.client,
                     model=self.model,
                     messages=[{"role": "user", "content": prompt}],
                     temperature=0,
                 )
-                raw = resp.choices[0].message.content.strip()
-                raw = re.sub(r"^```json|^```|```$", "", raw).strip()
-                data = json.loads(raw)
+                data = parse_llm_json(resp.choices[0].message.content)
                 job["skills_required"] = data.get("skills", [])
             except Exception as e:
                 logger.warning(f"Enrich skills error: {e}")
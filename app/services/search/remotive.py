@@ -1,5 +1,7 @@
 import logging
 import httpx
+from app.services.search.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.search.http import borrow_client, cached_get
 
 logger = logging.getLogger(__name__)
 
@@ -8,19 +10,25 @@ BASE_URL = "https://remotive.com/api/remote-jobs"
 
 class RemotiveService:
 
+    def __init__(self, http: httpx.AsyncClient | None = None):
+        self.http = http
+        self.breaker = CircuitBreaker("remotive")
+
     async def search(self, keywords: str) -> list[dict]:
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    BASE_URL,
+            async with borrow_client(self.http) as client:
+                resp = await cached_get(
+                    self.breaker, client, BASE_URL,
                     params={"search": keywords, "limit": 50},
-                    timeout=15,
                 )
                 resp.raise_for_status()
                 jobs = resp.json().get("jobs", [])
                 result = [self._normalize(j) for j in jobs]
                 logger.info(f"Remotive: {len(result)} jobs found")
                 return result
+        except CircuitOpenError:
+            logger.info("Remotive skipped (circuit open)")
+            return []
         except Exception as e:
             logger.error(f"Remotive search error: {e}")
             return []
@@ -0,0 +1,152 @@
+"""
+Compressed cache of upstream job-source responses.
+
+Entries are keyed by (source, url, query params), so identical searches from
+different users and keyword variants share them. An entry is *fresh* for
+SEARCH_CACHE_TTL seconds and served without any upstream call. After that it
+is kept as *stale* until SEARCH_CACHE_STALE_TTL so that sources sending
+ETag / Last-Modified can be revalidated with a conditional request.
+
+Backends: "redis" (shared by the cluster), "disk" (per host) or "none".
+Cache failures never fail a search; they are logged and treated as misses.
+Both backends are used without blocking the search event loop.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    status_code: int
+    body: bytes
+    content_type: str | None
+    etag: str | None
+    last_modified: str | None
+    fresh_until: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        headers = {"Content-Type": self.content_type} if self.content_type else {}
+        return httpx.Response(self.status_code, content=self.body, headers=headers, request=request)
+
+    def dumps(self) -> bytes:
+        envelope = {
+            "status_code": self.status_code,
+            "content_type": self.content_type,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fresh_until": self.fresh_until,
+            "body": self.body.decode("utf-8", errors="replace"),
+        }
+        return zlib.compress(json.dumps(envelope).encode(), level=6)
+
+    @classmethod
+    def loads(cls, blob: bytes) -> "CacheEntry":
+        envelope = json.loads(zlib.decompress(blob))
+        envelope["body"] = envelope["body"].encode()
+        return cls(**envelope)
+
+    @classmethod
+    def from_response(cls, resp: httpx.Response, ttl: int) -> "CacheEntry":
+        return cls(
+            status_code=resp.status_code,
+            body=resp.content,
+            content_type=resp.headers.get("Content-Type"),
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+            fresh_until=time.time() + ttl,
+        )
+
+
+def cache_key(source: str, url: str, params: Optional[dict]) -> str:
+    raw = json.dumps([source, url, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+
+    def __init__(self, backend: str | None = None):
+        self.backend = backend or settings.SEARCH_CACHE_BACKEND
+        self.directory = Path(settings.SEARCH_CACHE_DIR)
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend in ("redis", "disk")
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.z"
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        if time.time() - path.stat().st_mtime > settings.SEARCH_CACHE_STALE_TTL:
+            path.unlink(missing_ok=True)
+            return None
+        return path.read_bytes()
+
+    def _write_disk(self, key: str, blob: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(blob)
+        tmp.replace(path)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """A slow backend (over CIRCUIT_REDIS_TIMEOUT) counts as a miss, like an unreachable one."""
+        try:
+            if self.backend == "redis":
+                read = get_async_redis(decode_responses=False).get(f"srcache:{key}")
+            elif self.backend == "disk":
+                read = asyncio.to_thread(self._read_disk, key)
+            else:
+                return None
+            blob = await asyncio.wait_for(read, timeout=settings.CIRCUIT_REDIS_TIMEOUT)
+            return CacheEntry.loads(blob) if blob else None
+        except Exception as e:
+            logger.warning(f"Search cache read failed: {e!r}")
+            return None
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        try:
+            blob = entry.dumps()
+            if self.backend == "redis":
+                write = get_async_redis(decode_responses=False).set(
+                    f"srcache:{key}", blob, ex=settings.SEARCH_CACHE_STALE_TTL
+                )
+            elif self.backend == "disk":
+                write = asyncio.to_thread(self._write_disk, key, blob)
+            else:
+                return
+            await asyncio.wait_for(write, timeout=settings.CIRCUIT_REDIS_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Search cache write failed: {e!r}")
+
+
+response_cache = ResponseCache()
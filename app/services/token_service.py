@@ -1,9 +1,26 @@
+import logging
+import uuid
+from redis.exceptions import ResponseError
+from sqlalchemy import bindparam, or_
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.models.refresh_token import RefreshToken
+from app.core.auth import invalidate_auth_cache
+from app.core.redis_client import get_redis
 from app.core.security import hash_token
-from app.db.session import get_db
-from fastapi import Depends
+
+logger = logging.getLogger(__name__)
+
+# token id → last use (ISO), flushed to the table by flush_token_last_used()
+LAST_USED_KEY = "refresh_tokens:last_used"
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
 
 
 def store_refresh_token(
@@ -14,26 +31,26 @@ def store_refresh_token(
     device_id: str,
     device_name: str = None,
 ):
-    # Delete old token if exists
-    old_token = db.query(RefreshToken).filter(
-        RefreshToken.user_id == user_id,
-        RefreshToken.device_id == device_id,
-    ).first()
-
-    if old_token:
-        db.delete(old_token)
-        db.flush()                    # flush before insert to avoid unique conflict
-
-    db_token = RefreshToken(
-        user_id=user_id,
-        token_hash=hash_token(token),
-        device_id=device_id,
-        device_name=device_name,
-        expires_at=expires_at,
+    """
+    One upsert per login/rotation: a device keeps a single row (unique on
+    user_id, device_id) whose token is replaced, which also invalidates the
+    previous token of that device.
+    """
+    now = datetime.utcnow()
+    values = {
+        "token_hash": hash_token(token),
+        "device_name": device_name,
+        "expires_at": expires_at,
+        "revoked": False,
+        "created_at": now,
+        "last_used_at": now,
+    }
+    insert = _insert(db)
+    statement = insert(RefreshToken).values(
+        id=uuid.uuid4(), user_id=uuid.UUID(str(user_id)), device_id=str(device_id), **values
     )
-    db.add(db_token)
+    db.execute(statement.on_conflict_do_update(index_elements=["user_id", "device_id"], set_=values))
     db.commit()
-    return db_token
 
 # Validate a refresh token and return the corresponding database record
 def get_valid_refresh_token(db: Session, token: str):
@@ -50,24 +67,57 @@ def get_valid_refresh_token(db: Session, token: str):
     if db_token.expires_at < datetime.utcnow():
         return None
 
-    # Update last_used_at
-    db_token.last_used_at = datetime.utcnow()
-    db.commit()
+    record_token_use(db, db_token)
 
     return db_token
 
+
+def record_token_use(db: Session, db_token: RefreshToken) -> None:
+    """Buffer last_used_at in Redis; written in bulk by flush_token_last_used()."""
+    now = datetime.utcnow()
+    try:
+        get_redis().hset(LAST_USED_KEY, str(db_token.id), now.isoformat())
+    except Exception as e:
+        logger.warning(f"Could not buffer refresh token use, writing it directly: {e}")
+        db_token.last_used_at = now
+        db.commit()
+
+
+def flush_token_last_used(db: Session) -> int:
+    """Write the buffered last_used_at values in one bulk update."""
+    redis = get_redis()
+    # Swap the hash out atomically so uses recorded meanwhile go to a fresh one.
+    # A leftover from an interrupted flush is written first.
+    flushing = f"{LAST_USED_KEY}:flushing"
+    if not redis.exists(flushing):
+        try:
+            redis.rename(LAST_USED_KEY, flushing)
+        except ResponseError:
+            return 0  # nothing buffered
+    pending = redis.hgetall(flushing)
+    if pending:
+        table = RefreshToken.__table__
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("token_id"))
+            .values(last_used_at=bindparam("used_at")),
+            [
+                {"token_id": uuid.UUID(token_id), "used_at": datetime.fromisoformat(used_at)}
+                for token_id, used_at in pending.items()
+            ],
+        )
+        db.commit()
+    redis.delete(flushing)
+    return len(pending)
+
 # Revoke a single refresh token
 def revoke_refresh_token(db: Session, token: str):
     """Revoke a single refresh token."""
     token_hash = hash_token(token)
-    db_token = (
-        db.query(RefreshToken)
-        .filter(RefreshToken.token_hash == token_hash)
-        .first()
-    )
-    if db_token:
-        db_token.revoked = True
-        db.commit()
+    db.query(RefreshToken).filter(
+        RefreshToken.token_hash == token_hash
+    ).update({"revoked": True})
+    db.commit()
 
 # Revoke all refresh tokens for a user
 def revoke_all_user_tokens(db: Session, user_id):
@@ -76,6 +126,7 @@ def revoke_all_user_tokens(db: Session, user_id):
         RefreshToken.user_id == user_id
     ).update({"revoked": True})
     db.commit()
+    invalidate_auth_cache(user_id)
 
 # Retrieve all active sessions for a user
 def get_user_active_sessions(db: Session, user_id) -> list:
@@ -86,13 +137,20 @@ def get_user_active_sessions(db: Session, user_id) -> list:
         RefreshToken.expires_at > datetime.utcnow()
     ).all()
 
-def cleanup_expired_tokens(db: Session):
-    """Delete all expired or revoked tokens periodically"""
-    from sqlalchemy import or_
-    db.query(RefreshToken).filter(
-        or_(
-            RefreshToken.expires_at < datetime.utcnow(),
-            RefreshToken.revoked == True
-        )
-    ).delete()
-    db.commit()
\ No newline at end of file
+def cleanup_expired_tokens(db: Session, batch_size: int = 1000) -> int:
+    """Delete expired or revoked tokens, batch_size rows per transaction."""
+    deleted = 0
+    while True:
+        ids = [
+            row.id for row in db.query(RefreshToken.id).filter(
+                or_(
+                    RefreshToken.expires_at < datetime.utcnow(),
+                    RefreshToken.revoked == True
+                )
+            ).limit(batch_size).all()
+        ]
+        if not ids:
+            return deleted
+        db.query(RefreshToken).filter(RefreshToken.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
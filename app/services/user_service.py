@@ -1,20 +1,23 @@
 from uuid import UUID
 import uuid
 from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from app.models.user import User
 from app.schemas.user import UserCreate
+from app.core.auth import invalidate_auth_cache
 from app.core.security import get_password_hash
 from app.core.config import settings
-from app.services.email_service import send_email
+from app.services.email_service import aqueue_email
 
 
-def register_user(user: UserCreate, db: Session) -> User:
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def register_user(user: UserCreate, db: AsyncSession) -> User:
+    db_user = (await db.scalars(select(User).where(User.email == user.email))).first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     activation_token = str(uuid.uuid4())
     new_user = User(
         email=user.email,
@@ -26,16 +29,17 @@ def register_user(user: UserCreate, db: Session) -> User:
         reset_token_expires=datetime.utcnow() + timedelta(hours=24),
     )
 
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+
+    # Queued after the commit so no activation link goes out for a failed signup
     activation_link = f"{settings.FRONTEND_URL}/activate?token={activation_token}"
-    send_email(
+    await aqueue_email(
         to=user.email,
         subject="Activate your account",
         body=f"Click here to activate your account: {activation_link}"
     )
-
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
     return new_user
 
 
@@ -53,6 +57,8 @@ def activate_user(token: str, db: Session) -> dict:
     user.reset_token = None
     user.reset_token_expires = None
     db.commit()
+    # An inactive state may be cached from a request made before activation
+    invalidate_auth_cache(user.id)
 
     return {"message": "Your account has been activated successfully."}
 
@@ -0,0 +1,28 @@
+import logging
+import uuid
+from pathlib import Path
+from app.celery_app import celery
+from app.db.session import SessionLocal
+import app.models
+from app.models.user import User
+from app.services.cv_service import parse_cv_file
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(bind=True)
+def parse_cv_upload(self, user_id: str, file_path: str, file_hash: str | None = None) -> dict:
+    """
+    OCR + LLM enrichment of an uploaded CV, off the API event loop.
+    The result is polled through GET /cvs/upload/{job_id}.
+    """
+    db = SessionLocal()
+    try:
+        user_uuid = uuid.UUID(user_id)
+        user = db.query(User).filter(User.id == user_uuid).first()
+        cv = parse_cv_file(file_path, user_uuid, user.email if user else None, db, file_hash)
+        logger.info(f"parse_cv_upload {self.request.id}: is_cv={cv.is_cv}")
+        return {"user_id": user_id, "cv": cv.model_dump(mode="json")}
+    finally:
+        db.close()
+        Path(file_path).unlink(missing_ok=True)
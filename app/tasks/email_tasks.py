@@ -0,0 +1,106 @@
+import logging
+import smtplib
+from celery.signals import worker_process_shutdown
+from celery.utils.time import get_exponential_backoff_interval
+from app.celery_app import celery
+from app.db.session import SessionLocal
+import app.models
+from app.services.digest_service import send_pending_digests
+from app.services.email_service import close_smtp_connection, is_temporary_failure, send_emails
+
+logger = logging.getLogger(__name__)
+
+
+class TransientEmailError(Exception):
+    """A send that may succeed later; retried with exponential backoff and jitter."""
+
+
+def _is_transient(exc: Exception) -> bool:
+    """
+    Disconnects, connect errors, network errors and 4xx replies are retried.
+    5xx replies (bad credentials, refused sender...) fail at once: retrying
+    them only delays the error by hours.
+    """
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(exc, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+        return is_temporary_failure(exc)
+    if isinstance(exc, smtplib.SMTPException):  # an OSError too, but a protocol error
+        return False
+    return isinstance(exc, OSError)
+
+
+def _send(messages: list[dict]) -> tuple[list[dict], list[dict]]:
+    try:
+        return send_emails(messages)
+    except Exception as exc:
+        if _is_transient(exc):
+            raise TransientEmailError(repr(exc)) from exc
+        raise
+
+
+RETRY_ON = (TransientEmailError,)
+RETRY_BACKOFF = 30
+RETRY_BACKOFF_MAX = 1800
+MAX_RETRIES = 6
+
+
+@worker_process_shutdown.connect
+def close_smtp(**_):
+    close_smtp_connection()
+
+
+@celery.task(
+    autoretry_for=RETRY_ON,
+    retry_backoff=RETRY_BACKOFF,
+    retry_backoff_max=RETRY_BACKOFF_MAX,
+    retry_jitter=True,
+    max_retries=MAX_RETRIES,
+)
+def send_email_task(to: str, subject: str, body: str):
+    refused, deferred = _send([{"to": to, "subject": subject, "body": body}])
+    if deferred:
+        raise TransientEmailError(f"message to {to} deferred by the server")
+    if refused:
+        logger.error(f"send_email_task: message to {to} permanently refused")
+
+
+@celery.task(
+    bind=True,
+    autoretry_for=RETRY_ON,
+    retry_backoff=RETRY_BACKOFF,
+    retry_backoff_max=RETRY_BACKOFF_MAX,
+    retry_jitter=True,
+    max_retries=MAX_RETRIES,
+)
+def send_email_batch(self, messages: list[dict]):
+    """
+    Many messages over one SMTP session. Messages deferred by the server are
+    retried on their own; a connection error retries the whole batch, so keep
+    batches to messages where a rare duplicate is acceptable (digests).
+    """
+    refused, deferred = _send(messages)
+    sent = len(messages) - len(refused) - len(deferred)
+    logger.info(f"send_email_batch: {sent}/{len(messages)} sent, {len(deferred)} deferred")
+    if not deferred:
+        return
+    if self.request.retries >= self.max_retries:
+        logger.error(f"send_email_batch: giving up on {len(deferred)} deferred messages")
+        return
+    countdown = get_exponential_backoff_interval(
+        factor=RETRY_BACKOFF,
+        retries=self.request.retries,
+        maximum=RETRY_BACKOFF_MAX,
+        full_jitter=True,
+    )
+    raise self.retry(args=[deferred], countdown=countdown)
+
+
+@celery.task
+def send_job_digests():
+    db = SessionLocal()
+    try:
+        sent = send_pending_digests(db)
+        logger.info(f"send_job_digests: {sent} digests queued")
+    finally:
+        db.close()
@@ -1,41 +1,76 @@
 import logging
 import uuid
+from celery.signals import worker_process_init, worker_process_shutdown
 from app.celery_app import celery
+from app.core.llm import get_llm_client
+from app.core.metrics import REFRESH_NEW_JOBS, REFRESH_SECONDS
+from app.core.tracing import configure_tracing, set_attributes, shutdown_tracing, span
+from app.db.instrumentation import track_queries
 from app.db.session import SessionLocal
 import app.models
-from app.models.cv import CV
+from app.agents.refresh_context import RefreshContext, load_refresh_context, load_refresh_contexts
+from app.agents.search_agent import close_search_agent, get_search_agent
 from app.models.user import User
-from app.models.user_job_profile import UserJobProfile
+from app.services.digest_service import record_new_matches
 
 logger = logging.getLogger(__name__)
 
+REFRESH_CHUNK_SIZE = 500
+
+
+@worker_process_init.connect
+def init_worker_resources(**_):
+    """
+    Build the per-process singletons (LLM client, HTTP pools, caches) once,
+    after the fork, so tasks only pay for the user's own work.
+    """
+    get_llm_client.cache_clear()
+    configure_tracing()
+    get_search_agent()
+    logger.info("Worker process ready: SearchAgent initialised")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_resources(**_):
+    close_search_agent()
+    shutdown_tracing()
+
 
 @celery.task(bind=True, max_retries=3, default_retry_delay=120)
-def refresh_jobs_for_user(self, user_id: str):
-    from app.agents.search_agent import SearchAgent
+def refresh_jobs_for_user(self, user_id: str, context: dict | None = None):
+    """
+    `context` is a serialized RefreshContext. The batch scheduler passes it
+    pre-loaded; otherwise it is loaded here once and carried through retries.
+    """
+    # Outside the retry block: an unsupported worker pool fails the same way on every retry
+    agent = get_search_agent()
     db = SessionLocal()
     try:
         user_uuid = uuid.UUID(user_id)
-        user = db.query(User).filter(User.id == user_uuid).first()
-        if not user or not user.is_active:
-            logger.warning(f"User {user_id} not found or inactive")
-            return
-        cv = db.query(CV).filter(CV.user_id == user_uuid).first()
-        if not cv:
-            logger.warning(f"No CV for user {user_id}")
-            return
-
-        profile = db.query(UserJobProfile).filter(UserJobProfile.user_id == user_uuid).first()
-        if not profile:
-            logger.warning(f"No profile for user {user_id}")
-            return
-        agent = SearchAgent()
-        result = agent.run(user_uuid, db)
-        logger.info(f"refresh_jobs_for_user {user_uuid}: {result}")
+        if context is not None:
+            ctx = RefreshContext.from_dict(context)
+        else:
+            ctx = load_refresh_context(db, user_uuid)
+            if ctx is None:
+                return
+            context = ctx.to_dict()
+        # Root span of the refresh: every span below shares its trace id
+        with span("refresh_jobs_for_user", user_id=user_id, retry=self.request.retries) as refresh_span, \
+                track_queries("refresh_jobs_for_user") as query_stats, REFRESH_SECONDS.time():
+            result = agent.run(ctx, db)
+            set_attributes(
+                refresh_span,
+                new_jobs=result["new_jobs"],
+                total_searched=result["total_searched"],
+                db_queries=query_stats.count,
+            )
+        REFRESH_NEW_JOBS.observe(result["new_jobs"])
+        record_new_matches(user_uuid, result["new_job_ids"])
+        logger.info(f"refresh_jobs_for_user {user_uuid}: {result['new_jobs']}/{result['total_searched']} new")
         return result
     except Exception as exc:
-        logger.error(f"refresh_jobs_for_user error for {user_uuid}: {exc}")
-        raise self.retry(exc=exc)
+        logger.error(f"refresh_jobs_for_user error for {user_id}: {exc}")
+        raise self.retry(exc=exc, kwargs={"user_id": user_id, "context": context})
     finally:
         db.close()
 
@@ -44,9 +79,23 @@ def refresh_jobs_for_user(self, user_id: str):
 def refresh_all_users():
     db = SessionLocal()
     try:
-        users = db.query(User).filter(User.is_active == True).all()
-        for user in users:
-            refresh_jobs_for_user.delay(str(user.id))
-        logger.info(f"refresh_all_users: queued {len(users)} users")
+        user_ids = [row.id for row in db.query(User.id).filter(User.is_active == True).all()]
+        queued = 0
+        for i in range(0, len(user_ids), REFRESH_CHUNK_SIZE):
+            for ctx in load_refresh_contexts(db, user_ids[i:i + REFRESH_CHUNK_SIZE]):
+                refresh_jobs_for_user.delay(str(ctx.user_id), ctx.to_dict())
+                queued += 1
+        logger.info(f"refresh_all_users: queued {queued}/{len(user_ids)} users")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@celery.task
+def train_local_scoring_model():
+    from app.ai_engine.scoring.scorer import train_local_scorer  # numpy, only needed here
+    db = SessionLocal()
+    try:
+        model = train_local_scorer(db)
+        logger.info(f"train_local_scoring_model: {'trained' if model else 'skipped'}")
+    finally:
+        db.close()
@@ -0,0 +1,29 @@
+import logging
+from app.celery_app import celery
+from app.core.config import settings
+from app.db.session import SessionLocal
+import app.models
+from app.services.token_service import cleanup_expired_tokens, flush_token_last_used
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task
+def flush_refresh_token_usage():
+    db = SessionLocal()
+    try:
+        flushed = flush_token_last_used(db)
+        if flushed:
+            logger.info(f"flush_refresh_token_usage: {flushed} tokens updated")
+    finally:
+        db.close()
+
+
+@celery.task
+def cleanup_refresh_tokens():
+    db = SessionLocal()
+    try:
+        deleted = cleanup_expired_tokens(db, batch_size=settings.REFRESH_TOKEN_CLEANUP_BATCH)
+        logger.info(f"cleanup_refresh_tokens: {deleted} expired or revoked tokens deleted")
+    finally:
+        db.close()
@@ -0,0 +1,203 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import digest_service
+from app.services.digest_service import (
+    PENDING_JOBS_PREFIX,
+    PENDING_USERS_KEY,
+    PROCESSING_JOBS_PREFIX,
+    PROCESSING_USERS_KEY,
+    SEND_LOCK_KEY,
+    _claim_pending,
+    _release,
+    record_new_matches,
+    send_pending_digests,
+)
+
+
+class FakeRedis:
+    """The set commands the digest keys use, on plain Python sets."""
+
+    def __init__(self):
+        self.sets: dict[str, set[str]] = {}
+        self.strings: dict[str, str] = {}
+
+    def _store(self, key: str, members: set[str]) -> None:
+        if members:
+            self.sets[key] = members
+        else:
+            self.sets.pop(key, None)
+
+    def sadd(self, key, *members):
+        self._store(key, self.sets.get(key, set()) | set(members))
+
+    def srem(self, key, *members):
+        self._store(key, self.sets.get(key, set()) - set(members))
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def srandmember(self, key, count):
+        return sorted(self.sets.get(key, set()))[:count]
+
+    def smove(self, source, destination, member):
+        if member not in self.sets.get(source, set()):
+            return False
+        self.srem(source, member)
+        self.sadd(destination, member)
+        return True
+
+    def sunionstore(self, destination, keys):
+        self._store(destination, set().union(*(self.sets.get(key, set()) for key in keys)))
+        return len(self.sets.get(destination, set()))
+
+    def delete(self, *keys):
+        for key in keys:
+            self.sets.pop(key, None)
+            self.strings.pop(key, None)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(digest_service, "get_redis", lambda: fake)
+    return fake
+
+
+def test_claim_moves_pending_to_processing(redis):
+    record_new_matches("u1", ["j1", "j2"])
+    record_new_matches("u2", ["j3"])
+
+    claimed = _claim_pending(max_users=10)
+
+    assert {user: sorted(jobs) for user, jobs in claimed.items()} == {"u1": ["j1", "j2"], "u2": ["j3"]}
+    assert redis.smembers(PENDING_USERS_KEY) == set()
+    assert redis.smembers(f"{PENDING_JOBS_PREFIX}u1") == set()
+    assert redis.smembers(PROCESSING_USERS_KEY) == {"u1", "u2"}
+    assert redis.smembers(f"{PROCESSING_JOBS_PREFIX}u1") == {"j1", "j2"}
+
+
+def test_claim_takes_at_most_max_users(redis):
+    for user in ("u1", "u2", "u3"):
+        record_new_matches(user, ["j"])
+
+    assert len(_claim_pending(max_users=2)) == 2
+    assert len(redis.smembers(PENDING_USERS_KEY)) == 1
+
+
+def test_release_delivered_drops_the_claim(redis):
+    record_new_matches("u1", ["j1"])
+    claimed = _claim_pending(max_users=10)
+
+    _release(claimed, delivered=True)
+
+    assert redis.sets == {}
+
+
+def test_release_undelivered_hands_digest_back(redis):
+    record_new_matches("u1", ["j1"])
+    claimed = _claim_pending(max_users=10)
+    # A refresh finished while the digest was being built
+    record_new_matches("u1", ["j2"])
+
+    _release(claimed, delivered=False)
+
+    assert redis.smembers(PENDING_USERS_KEY) == {"u1"}
+    assert redis.smembers(f"{PENDING_JOBS_PREFIX}u1") == {"j1", "j2"}
+    assert redis.smembers(PROCESSING_USERS_KEY) == set()
+
+
+def test_claim_after_crash_merges_leftover(redis):
+    record_new_matches("u1", ["j1"])
+    _claim_pending(max_users=10)
+    # The run crashed before _release; new matches came in since
+    record_new_matches("u1", ["j2"])
+
+    claimed = _claim_pending(max_users=10)
+
+    assert sorted(claimed["u1"]) == ["j1", "j2"]
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Messages handed to the email batch task, without importing the worker side."""
+    batches = []
+    tasks = SimpleNamespace(send_email_batch=SimpleNamespace(delay=batches.append))
+    monkeypatch.setitem(sys.modules, "app.tasks.email_tasks", tasks)
+    return batches
+
+
+def fake_build(pending_seen):
+    def build(db, pending):
+        pending_seen.append(pending)
+        return [{"to": f"{user}@example.com"} for user in pending]
+    return build
+
+
+def test_send_requeues_leftover_of_crashed_run(redis, queued, monkeypatch):
+    seen = []
+    monkeypatch.setattr(digest_service, "build_digests", fake_build(seen))
+    record_new_matches("u1", ["j1"])
+    _claim_pending(max_users=10)  # claimed by a run that crashed
+
+    assert send_pending_digests(db=None) == 1
+
+    assert seen == [{"u1": ["j1"]}]
+    assert queued == [[{"to": "u1@example.com"}]]
+    assert redis.sets == {}
+    assert SEND_LOCK_KEY not in redis.strings
+
+
+def test_send_failure_keeps_digests_for_next_run(redis, queued, monkeypatch):
+    def failing_build(db, pending):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(digest_service, "build_digests", failing_build)
+    record_new_matches("u1", ["j1"])
+
+    with pytest.raises(RuntimeError):
+        send_pending_digests(db=None)
+
+    assert queued == []
+    assert redis.smembers(PENDING_USERS_KEY) == {"u1"}
+    assert redis.smembers(f"{PENDING_JOBS_PREFIX}u1") == {"j1"}
+    assert SEND_LOCK_KEY not in redis.strings
+
+    seen = []
+    monkeypatch.setattr(digest_service, "build_digests", fake_build(seen))
+    assert send_pending_digests(db=None) == 1
+    assert seen == [{"u1": ["j1"]}]
+
+
+def test_send_skips_while_another_run_holds_the_lock(redis, queued):
+    redis.set(SEND_LOCK_KEY, "1")
+    record_new_matches("u1", ["j1"])
+
+    assert send_pending_digests(db=None) == 0
+    assert redis.smembers(PENDING_USERS_KEY) == {"u1"}
@@ -0,0 +1,49 @@
+from app.utils.json_stream import JSONArrayStream, parse_llm_json
+
+
+def feed_all(chunks: list[str]) -> tuple[list[dict], JSONArrayStream]:
+    parser = JSONArrayStream()
+    objects = [obj for chunk in chunks for obj in parser.feed(chunk)]
+    return objects, parser
+
+
+def test_objects_yielded_as_they_close():
+    parser = JSONArrayStream()
+    assert parser.feed('{"scores": [{"i": 0, "s": 8') == []
+    assert parser.feed('0}, {"i": 1') == [{"i": 0, "s": 80}]
+    assert parser.feed(', "s": 15}]}') == [{"i": 1, "s": 15}]
+    assert parser.done
+
+
+def test_character_by_character_stream():
+    text = '```json\n[{"index": 0, "summary": "uses [brackets] and {braces}"}, {"index": 1}]\n```'
+    objects, parser = feed_all(list(text))
+    assert objects == [{"index": 0, "summary": "uses [brackets] and {braces}"}, {"index": 1}]
+    assert parser.done
+
+
+def test_escaped_quotes_inside_strings():
+    objects, _ = feed_all(['[{"summary": "a \\"quoted\\" } word"}, {"i": 2}]'])
+    assert objects == [{"summary": 'a "quoted" } word'}, {"i": 2}]
+
+
+def test_truncated_stream_keeps_completed_objects():
+    objects, parser = feed_all(['{"scores": [{"i": 0, "s": 70}, {"i": 1, "s": 6'])
+    assert objects == [{"i": 0, "s": 70}]
+    assert not parser.done
+
+
+def test_malformed_object_is_skipped():
+    objects, _ = feed_all(['[{"i": 0, "s": 70}, {"i": 1, "s": }, {"i": 2, "s": 40}]'])
+    assert objects == [{"i": 0, "s": 70}, {"i": 2, "s": 40}]
+
+
+def test_text_after_the_array_is_ignored():
+    objects, parser = feed_all(['[{"i": 0}] and then [{"i": 1}]'])
+    assert objects == [{"i": 0}]
+    assert parser.done
+
+
+def test_parse_llm_json_strips_fences_and_prose():
+    assert parse_llm_json('```json\n{"score": 80}\n```') == {"score": 80}
+    assert parse_llm_json('Here you go: {"score": 80} hope it helps') == {"score": 80}
@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai_engine.scoring.batcher import pack_batches
+from app.ai_engine.scoring.rules import FEATURE_NAMES, MatchProfile, _contract_kind, _job_features, mentioned_skills
+from app.core.tokens import ModelLimits
+
+
+def make_profile(**overrides) -> MatchProfile:
+    context = {
+        "cv_data": {},
+        "skills": [],
+        "years_experience": 3,
+        "target_role": "Backend developer",
+        "location": "Paris",
+        "remote_preference": "any",
+        "contract_preference": [],
+        "min_salary": None,
+    }
+    context.update(overrides)
+    return MatchProfile(SimpleNamespace(**context))
+
+
+def feature(profile: MatchProfile, job: dict, name: str) -> float:
+    return _job_features(profile, job)[FEATURE_NAMES.index(name)]
+
+
+# --- rule features ---------------------------------------------------------
+
+@pytest.mark.parametrize("skill, description", [
+    ("go", "we are looking for a good engineer"),
+    ("java", "strong javascript experience"),
+    ("sql", "nosql databases only"),
+    ("r", "react and rust"),
+    ("c", "c++ and c# developers"),
+])
+def test_skill_substrings_are_not_mentions(skill, description):
+    assert mentioned_skills({skill}, description) == set()
+
+
+@pytest.mark.parametrize("skill, description", [
+    ("go", "backend services in go, deployed on k8s"),
+    ("c#", "c# and .net core"),
+    ("c++", "modern c++."),
+    ("r", "statistics in r or python"),
+    ("javascript", "js/ts front-end"),
+    ("machine learning", "applied machine learning team"),
+    ("machine learning", "ml engineer"),
+])
+def test_whole_word_mentions(skill, description):
+    assert mentioned_skills({skill}, description) == {skill}
+
+
+def test_description_skills_feature():
+    profile = make_profile(skills=["Go", "Java", "SQL", "Docker"])
+    job = {"title": "Backend developer", "description": "Good JavaScript and NoSQL skills, Docker a plus"}
+    assert feature(profile, job, "description_skills") == pytest.approx(0.25)
+
+
+@pytest.mark.parametrize("value, kind", [
+    ("CDI", "permanent"),
+    ("fulltime", "permanent"),
+    ("CDD 6 mois", "temporary"),
+    ("Mission freelance", "freelance"),
+    ("commission-based", None),
+    ("Stage de fin d'études", "internship"),
+    ("", None),
+])
+def test_contract_kind(value, kind):
+    assert _contract_kind(value) == kind
+
+
+def test_contract_feature_ignores_alias_inside_words():
+    profile = make_profile(contract_preference=["CDI"])
+    assert feature(profile, {"contract": "commission"}, "contract_fit") == 0.5
+    assert feature(profile, {"contract": "CDD"}, "contract_fit") == 0.0
+    assert feature(profile, {"contract": "full-time"}, "contract_fit") == 1.0
+
+
+def test_features_are_in_unit_range():
+    profile = make_profile(skills=["python", "django"], contract_preference=["cdi"], min_salary=50000)
+    job = {
+        "title": "Senior Python developer",
+        "description": "5+ years of Python and Django",
+        "skills_required": ["Python", "PostgreSQL"],
+        "location": "Paris",
+        "contract": "CDI",
+        "salary_max": 80000,
+    }
+    features = _job_features(profile, job)
+    assert len(features) == len(FEATURE_NAMES)
+    assert all(0.0 <= value <= 1.0 for value in features)
+
+
+# --- token-budget batching -------------------------------------------------
+
+LIMITS = ModelLimits(context=1000, max_output=100)
+
+
+def test_pack_batches_respects_max_items():
+    batches = pack_batches([10] * 5, [1] * 5, fixed_input_tokens=0, limits=LIMITS, max_items=2)
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_pack_batches_respects_context_budget():
+    # budget 900 (context_fill 0.9): 100 fixed + 3 * (250 + 10) fits, a fourth does not
+    batches = pack_batches([250] * 4, [10] * 4, fixed_input_tokens=100, limits=LIMITS, max_items=50)
+    assert batches == [[0, 1, 2], [3]]
+
+
+def test_pack_batches_respects_output_limit():
+    batches = pack_batches([1] * 4, [40] * 4, fixed_input_tokens=0, limits=LIMITS, max_items=50)
+    assert batches == [[0, 1], [2, 3]]
+
+
+def test_pack_batches_oversized_item_gets_its_own_batch():
+    batches = pack_batches([10, 5000, 10], [1, 1, 1], fixed_input_tokens=0, limits=LIMITS, max_items=50)
+    assert batches == [[0], [1], [2]]
+
+
+def test_pack_batches_keeps_every_item_in_order():
+    sizes = [37, 400, 12, 250, 90, 600, 5]
+    batches = pack_batches(sizes, [8] * len(sizes), fixed_input_tokens=50, limits=LIMITS, max_items=3)
+    assert [i for batch in batches for i in batch] == list(range(len(sizes)))
+
+
+def test_pack_batches_empty():
+    assert pack_batches([], [], fixed_input_tokens=100, limits=LIMITS, max_items=10) == []
@@ -0,0 +1,83 @@
+"""
+Tolerant JSON parsing for LLM output.
+"""
+
+import json
+import re
+from typing import Any
+
+_FENCE = re.compile(r"^```(?:json)?|```$", re.MULTILINE)
+
+
+def parse_llm_json(raw: str) -> Any:
+    """
+    Parse a JSON value from an LLM completion: strips markdown fences and
+    ignores prose before or after the value. Raises json.JSONDecodeError.
+    """
+    text = _FENCE.sub("", raw).strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+        if not starts:
+            raise
+        value, _ = json.JSONDecoder().raw_decode(text, min(starts))
+        return value
+
+
+class JSONArrayStream:
+    """
+    Incremental parser yielding the objects of the first JSON array in a
+    stream as soon as each one closes, e.g.
+
+        '```json\\n[{"index": 0, ...}, {"ind'  -> [{"index": 0, ...}]
+
+    The array may be top-level or nested (`{"scores": [...]}`). Anything
+    outside it (fences, prose) is ignored, and a truncated stream keeps
+    every object completed so far.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._array_depth: int | None = None
+        self._in_string = False
+        self._escape = False
+        self._current: list[str] | None = None
+        self.done = False
+
+    def feed(self, chunk: str) -> list[dict]:
+        completed = []
+        for ch in chunk:
+            if self.done:
+                break
+            if self._current is not None:
+                self._current.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+                if ch == "[" and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._current = ["{"]
+            elif ch in "]}":
+                if ch == "}" and self._current is not None and self._depth == self._array_depth + 1:
+                    try:
+                        completed.append(json.loads("".join(self._current)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._current = None
+                elif ch == "]" and self._depth == self._array_depth:
+                    self.done = True
+                self._depth -= 1
+        return completed
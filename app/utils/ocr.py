@@ -2,24 +2,159 @@
 OCR and text extraction utilities.
 """
 
-import pdfplumber
-import pytesseract
-from PIL import Image
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.utils.text import PAGE_BREAK
+
+_ocr_pool: ThreadPoolExecutor | None = None
+# pypdfium2 (pdfplumber's rasterizer) is not thread-safe: one render at a time per process
+_render_lock = threading.Lock()
+
+# Long side of an A4 page, in inches: images are scaled to OCR_DPI against it
+_PAGE_LONG_SIDE_INCHES = 11.69
+
+
+def _get_ocr_pool() -> ThreadPoolExecutor:
+    """
+    Threads, not processes: Celery prefork children are daemonic and may not
+    start processes. OCR runs in a tesseract subprocess, so pages still
+    proceed in parallel.
+    """
+    global _ocr_pool
+    if _ocr_pool is None:
+        _ocr_pool = ThreadPoolExecutor(max_workers=settings.PDF_EXTRACT_WORKERS, thread_name_prefix="ocr")
+    return _ocr_pool
+
+
+def _render_pdf_page(page, dpi: int) -> Image.Image:
+    """
+    Rasterize a page that has no text layer (scanned PDF) for OCR.
+    """
+    with _render_lock:
+        return page.to_image(resolution=dpi).original
+
+
+def _ocr_scan(image: Image.Image) -> str:
+    return _ocr(preprocess_for_ocr(image))
 
 
 def extract_text_from_pdf(file_path: str) -> str:
     """
-    Extract text from a PDF file.
+    Extract text from a PDF file. Pages without a text layer are rendered
+    one at a time and OCRed, in parallel for multi-page documents (the text
+    layer itself is cheap and read in order). Pages are separated by PAGE_BREAK.
     """
-    text = ""
+    import pdfplumber  # heavy (pdfminer), deferred to first use
+
+    dpi = settings.OCR_DPI
+    pages: list[str | Future] = []
     with pdfplumber.open(file_path) as pdf:
+        parallel = settings.PDF_EXTRACT_WORKERS > 1 and len(pdf.pages) >= settings.PDF_PARALLEL_MIN_PAGES
         for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
+            text = page.extract_text() or ""
+            if text.strip():
+                pages.append(text)
+                continue
+            # Next page renders while tesseract reads this one
+            image = _render_pdf_page(page, dpi)
+            pages.append(_get_ocr_pool().submit(_ocr_scan, image) if parallel else _ocr_scan(image))
+
+    # Page breaks kept so clean_cv_text can tell headers/footers from the body
+    return PAGE_BREAK.join(page if isinstance(page, str) else page.result() for page in pages)
 
 
 def extract_text_from_image(file_path: str) -> str:
     """
     Extract text from an image using OCR.
     """
-    return pytesseract.image_to_string(Image.open(file_path))
+    with Image.open(file_path) as image:
+        # Let the JPEG decoder downscale while decoding (large phone photos)
+        max_side = _max_side()
+        if max(image.size) > max_side:
+            ratio = max_side / max(image.size)
+            image.draft("L", (int(image.width * ratio), int(image.height * ratio)))
+        return _ocr(preprocess_for_ocr(image))
+
+
+def _ocr(image: Image.Image) -> str:
+    import pytesseract
+
+    return pytesseract.image_to_string(
+        image,
+        lang=settings.OCR_LANGUAGES,
+        config=f"--psm {settings.OCR_PSM}",
+    )
+
+
+def _max_side() -> int:
+    """Largest useful long side in pixels: an A4 page at OCR_DPI."""
+    return int(_PAGE_LONG_SIDE_INCHES * settings.OCR_DPI)
+
+
+def preprocess_for_ocr(image: Image.Image) -> Image.Image:
+    """
+    EXIF orientation, grayscale, downscale to OCR_DPI, Otsu binarization
+    and (when OCR_DESKEW is on) small-angle deskew.
+    """
+    image = ImageOps.exif_transpose(image)
+    gray = image.convert("L")
+
+    max_side = _max_side()
+    if max(gray.size) > max_side:
+        gray.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    threshold = _otsu_threshold(gray)
+    binary = gray.point(lambda p: 255 if p > threshold else 0)
+
+    if settings.OCR_DESKEW:
+        angle = _estimate_skew(binary)
+        if angle:
+            binary = binary.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return binary
+
+
+def _otsu_threshold(gray: Image.Image) -> int:
+    hist = gray.histogram()
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg = weight_bg = 0
+    best_variance, threshold = 0.0, 127
+    for t in range(256):
+        weight_bg += hist[t]
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += t * hist[t]
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if variance > best_variance:
+            best_variance, threshold = variance, t
+    return threshold
+
+
+def _estimate_skew(binary: Image.Image) -> float:
+    """
+    Projection-profile deskew on a thumbnail: the rotation whose row sums
+    vary the most is the one where text lines are horizontal.
+    """
+    thumb = ImageOps.invert(binary)
+    thumb.thumbnail((800, 800))
+    steps = int(settings.OCR_DESKEW_MAX_ANGLE / settings.OCR_DESKEW_STEP)
+    best_angle, best_score = 0.0, -1.0
+    for step in range(-steps, steps + 1):
+        angle = step * settings.OCR_DESKEW_STEP
+        rotated = thumb.rotate(angle, fillcolor=0)
+        # Width-1 box resize gives the mean of every row
+        rows = list(rotated.resize((1, rotated.height), Image.BOX).getdata())
+        mean = sum(rows) / len(rows)
+        score = sum((r - mean) ** 2 for r in rows)
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
@@ -74,3 +74,35 @@ CV TEXT TO PARSE:
 {raw_text}
 """
     return prompt
+
+
+def generate_cv_section_parsing_prompt(raw_text: str) -> str:
+    """
+    Prompt for a continuation chunk of a long CV (the first chunk uses
+    generate_cv_parsing_prompt and decides whether the document is a CV).
+    """
+    prompt = f"""
+You are a CV parser assistant. The text below is ONE PART of a longer CV.
+
+Return STRICT JSON with whatever this part contains, using this schema:
+{{
+    "full_name": null,
+    "email": null,
+    "phone": null,
+    "location": null,
+    "summary": null,
+    "skills": [],
+    "experience": [],
+    "education": []
+}}
+
+- skills (list of strings)
+- experience (list of objects: title, company, role, start_date, end_date, description)
+- education (list of objects: degree, school, start_date, end_date)
+
+Do NOT invent any information. If a field is missing, set it to null or empty list.
+
+CV PART TO PARSE:
+{raw_text}
+"""
+    return prompt
@@ -0,0 +1,118 @@
+"""
+Text clean-up helpers for extracted CV text.
+"""
+
+import re
+
+# "Page 2", "page 2/3", "2 of 3", "2 / 3"; not a bare number ("2019") nor a date ("09/2019")
+_PAGE_MARKER = re.compile(
+    r"^(page\s*\d{1,3}(\s*(/|of|sur)\s*\d{1,3})?|\d{1,2}\s*(/|of|sur)\s*\d{1,2})$", re.IGNORECASE
+)
+# Form feed: page separator in extract_text_from_pdf output
+PAGE_BREAK = "\f"
+# Lines at the top/bottom of each page searched for headers/footers
+_EDGE_LINES = 2
+_SECTION_HEADING = re.compile(
+    r"^(experiences?|expériences?|work experience|professional experience|education|formations?|"
+    r"skills|compétences|projects?|projets|languages|langues|certifications?|summary|profil|profile|"
+    r"interests|centres d'intérêt|references)\b",
+    re.IGNORECASE,
+)
+
+
+def clean_cv_text(raw_text: str) -> str:
+    """
+    Cut prompt tokens before sending a CV to the LLM: collapse whitespace,
+    drop page numbers and, in multi-page PDF text (pages separated by
+    PAGE_BREAK), the header/footer lines repeated at the top/bottom of
+    every page. Lines repeated in the body (job titles, years) are kept.
+    """
+    pages = [
+        [" ".join(line.split()) for line in page.splitlines()]
+        for page in raw_text.split(PAGE_BREAK)
+    ]
+    headers = _common_lines([_content(page)[:_EDGE_LINES] for page in pages])
+    footers = _common_lines([_content(page)[-_EDGE_LINES:] for page in pages])
+
+    cleaned = []
+    for number, page in enumerate(pages, start=1):
+        content = [i for i, line in enumerate(page) if line]
+        top, bottom = set(content[:_EDGE_LINES]), set(content[-_EDGE_LINES:])
+        for i, line in enumerate(page):
+            if _PAGE_MARKER.match(line):
+                continue
+            if i in top and line in headers or i in bottom and (line in footers or line == str(number)):
+                continue
+            if not line and (not cleaned or not cleaned[-1]):
+                continue
+            cleaned.append(line)
+    return "\n".join(cleaned).strip()
+
+
+def _content(page: list[str]) -> list[str]:
+    return [line for line in page if line]
+
+
+def _common_lines(edges: list[list[str]]) -> set[str]:
+    """Lines present in the edge of every page (none for a single page)."""
+    if len(edges) < 2:
+        return set()
+    common = set(edges[0])
+    for edge in edges[1:]:
+        common &= set(edge)
+    return common
+
+
+def _is_heading(line: str) -> bool:
+    if not line or len(line) > 40:
+        return False
+    return bool(_SECTION_HEADING.match(line)) or (line.isupper() and len(line.split()) <= 4)
+
+
+def split_cv_sections(text: str, max_chars: int) -> list[str]:
+    """
+    Split a long CV into chunks of at most `max_chars`, cutting at section
+    headings when possible and at line boundaries otherwise.
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    sections: list[list[str]] = [[]]
+    for line in text.splitlines():
+        if _is_heading(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+
+    chunks: list[str] = []
+    current = ""
+    for section in sections:
+        for block in _split_long("\n".join(section), max_chars):
+            if current and len(current) + len(block) + 1 > max_chars:
+                chunks.append(current)
+                current = block
+            else:
+                current = f"{current}\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(text: str, max_chars: int) -> list[str]:
+    if len(text) <= max_chars:
+        return [text]
+    blocks, current = [], ""
+    for line in text.splitlines():
+        while len(line) > max_chars:
+            if current:
+                blocks.append(current)
+                current = ""
+            blocks.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            blocks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        blocks.append(current)
+    return blocks
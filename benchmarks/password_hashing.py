@@ -0,0 +1,55 @@
+"""
+Login throughput of the argon2 settings in use (ARGON2_* / PASSWORD_HASH_WORKERS).
+
+    python -m benchmarks.password_hashing --seconds 10
+
+Runs password verifications through app.core.security with 1..N concurrent
+async callers and reports verifications per second, overall and per core.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+
+async def _run(concurrency: int, seconds: float, hashed: str) -> int:
+    deadline = time.perf_counter() + seconds
+
+    async def caller() -> int:
+        done = 0
+        while time.perf_counter() < deadline:
+            await verify_password("correct horse battery staple", hashed)
+            done += 1
+        return done
+
+    return sum(await asyncio.gather(*(caller() for _ in range(concurrency))))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--max-concurrency", type=int, default=settings.PASSWORD_HASH_WORKERS * 2)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(
+        f"argon2 time_cost={settings.ARGON2_TIME_COST} memory_cost={settings.ARGON2_MEMORY_COST} KiB "
+        f"parallelism={settings.ARGON2_PARALLELISM}; pool={settings.PASSWORD_HASH_WORKERS} workers, {cores} cores"
+    )
+    start = time.perf_counter()
+    hashed = await get_password_hash("correct horse battery staple")
+    print(f"single hash: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    concurrency = 1
+    while concurrency <= args.max_concurrency:
+        total = await _run(concurrency, args.seconds, hashed)
+        rate = total / args.seconds
+        print(f"concurrency={concurrency:3d}  {rate:8.1f} logins/s  {rate / cores:8.1f} logins/s/core")
+        concurrency *= 2
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Cold-start import cost of the API and of a Celery worker, from `python -X importtime`.
+
+    python -m benchmarks.startup_importtime --top 15
+
+Each target is imported in a fresh interpreter; the report gives the total
+import time and the slowest top-level packages (cumulative microseconds).
+"""
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+
+TARGETS = {
+    "api": "import app.main",
+    "worker": "import app.celery_app, app.tasks.jobs_tasks, app.tasks.cv_tasks, app.tasks.email_tasks, app.tasks.token_tasks",
+}
+
+
+def import_times(statement: str) -> tuple[int, dict[str, int]]:
+    """(total µs, cumulative µs per top-level package) for one import statement."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total = 0
+    packages: dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under their parent; top-level ones are
+        # not, and their cumulative times add up to the total
+        if name[1:2] != " ":
+            total += int(cumulative)
+            packages[name.strip().split(".")[0]] += int(cumulative)
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("targets", nargs="*", default=list(TARGETS), choices=list(TARGETS))
+    args = parser.parse_args()
+
+    for target in args.targets:
+        total, packages = import_times(TARGETS[target])
+        print(f"{target}: {total / 1000:.0f} ms")
+        for name, micros in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"  {micros / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()